@@ -12,7 +12,7 @@ from datetime import datetime, timedelta
 from backend.config_manager import ConfigManager
 from backend.job_store import JobStore, JobStatus
 from backend.backend_orchestrator import BackendOrchestrator
-from backend.ai_processor import AIProcessor
+from backend.ai_processor import AIProcessor, CACHE_INVALIDATING_CONFIG_KEYS
 from backend.library_browser import LibraryBrowser
 
 # Configure logging with UTF-8 encoding and rotation to keep log manageable
@@ -376,6 +376,8 @@ def re_ai_job(job_id):
         if success:
             logger.info(f"Job {job_id} queued for re-processing")
             return jsonify({'success': True, 'message': 'Job queued for re-processing'})
+        if job_store.get_job(job_id):
+            return jsonify({'error': 'Job is already being processed by AI, try again when it finishes'}), 409
         logger.warning(f"Job {job_id} not found for re-AI")
         return jsonify({'error': 'Job not found'}), 404
     except Exception as e:
@@ -439,6 +441,12 @@ def update_config():
         'ENABLE_LIBRARY_TOOL',
         'ENABLE_PENDING_TOOL',
         'AI_CALL_DELAY_SECONDS',
+        'AI_CONCURRENCY',
+        'AI_CACHE_TTL_SECONDS',
+        'SHARD_SIZE',
+        'FS_WORKERS',
+        'WATCH_MODE',
+        'POLL_INTERVAL_SECONDS',
         'JELLYFIN_REFRESH_ENABLED',
         'APP_PASSWORD',
         'ADMIN_PASSWORD',
@@ -457,10 +465,14 @@ def update_config():
     ]
     
     updates = {k: v for k, v in data.items() if k in allowed_fields}
+    # Saving through the API does not fire ConfigManager change callbacks, so check here too
+    model_changed = any(k in updates and updates[k] != config_manager.get(k) for k in CACHE_INVALIDATING_CONFIG_KEYS)
     
     success = config_manager.update_config(updates)
     
     if success:
+        if model_changed:
+            ai_processor.invalidate_cache()
         return jsonify({'success': True, 'message': 'Configuration updated successfully'})
     return jsonify({'error': 'Failed to update configuration'}), 500
 
@@ -631,7 +643,8 @@ def re_ai_library_file():
             custom_prompt=custom_prompt,
             include_default=include_instructions,
             include_filename=include_filename,
-            enable_web_search=enable_web_search
+            enable_web_search=enable_web_search,
+            use_cache=False
         )
         
         if result:
@@ -694,6 +707,7 @@ def save_instruction_prompt():
             f.write(content)
         
         logger.info(f"Custom instruction prompt saved to {custom_path}")
+        ai_processor.invalidate_cache()
         return jsonify({'success': True, 'message': 'Instructions saved successfully'})
     except Exception as e:
         logger.error(f"Error saving instruction prompt: {type(e).__name__}: {e}", exc_info=True)
@@ -712,6 +726,7 @@ def reset_instruction_prompt():
         if os.path.exists(custom_path):
             os.remove(custom_path)
             logger.info(f"Deleted custom instruction prompt: {custom_path}")
+            ai_processor.invalidate_cache()
         
         # Return the base instructions
         base_path = 'instruction_prompt.md'
@@ -724,6 +739,20 @@ def reset_instruction_prompt():
         return jsonify({'error': 'Failed to reset instruction prompt'}), 500
 
 
+@app.route('/api/ai-cache/clear', methods=['POST'])
+@require_app_password
+@require_admin_password
+def clear_ai_cache():
+    """Drop every cached AI response so the next request asks the provider again"""
+    logger.info("API: Clear AI response cache request")
+    try:
+        removed = ai_processor.invalidate_cache()
+        return jsonify({'success': True, 'removed': removed})
+    except Exception as e:
+        logger.error(f"Error clearing AI response cache: {type(e).__name__}: {e}", exc_info=True)
+        return jsonify({'error': 'Failed to clear AI response cache'}), 500
+
+
 if __name__ == '__main__':
     os.makedirs('./test_folders/downloading', exist_ok=True)
     os.makedirs('./test_folders/completed', exist_ok=True)
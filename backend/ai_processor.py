@@ -1,33 +1,168 @@
+"""
+AI provider integration (Google, OpenAI, OpenRouter, Ollama) for suggesting file names.
+
+Performance note: this module is network-bound. A provider round-trip costs
+100-10,000x more than any local work here, so optimise with connection reuse
+(http_session), fewer/cheaper calls (the call-delay gate, retries with backoff,
+concurrent batches) and caching (instructions, tool definitions) rather than
+CPU tricks. Local JSON and logging costs are already kept off the hot path via
+json_utils (orjson when installed) and INFO-gated, lazily formatted logs.
+"""
+
+import hashlib
 import json
 import logging
 import os
+import random
+import re
 import requests
+import threading
 import time
-from typing import List, Dict, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import List, Dict, Mapping, Optional, Callable, Tuple
 from openai import OpenAI
 from backend.tmdb_api import TMDBClient, format_tool_response
 from backend.openlibrary_api import OpenLibraryClient, format_openlibrary_response
 from backend.comicvine_api import ComicVineClient, format_comicvine_response
 from backend.musicbrainz_api import MusicBrainzClient, format_musicbrainz_response
 from backend.job_store import JobStatus
+from backend import json_utils
+from backend.response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+_BANNER = "=" * 80
+
+
+def _log_banner(title: str, *lines: str) -> None:
+    """Emit a framed request/response summary as a single INFO record."""
+    logger.info("\n".join((_BANNER, title, _BANNER) + lines + (_BANNER,)))
+
+
+class _LazyJson:
+    """Defer pretty-printing a payload until a log record is actually emitted."""
+    __slots__ = ('obj',)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __str__(self) -> str:
+        return json_utils.dumps_pretty(self.obj)
+
+
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+GOOGLE_GENERATE_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+OLLAMA_GENERATE_PATH = "/api/generate"
+OLLAMA_TAGS_PATH = "/api/tags"
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# HTTP statuses worth retrying with backoff instead of failing the whole batch
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_POST_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_MAX_SECONDS = 60
+
+# Settings that change which model answers; cached responses are dropped when any of them changes
+CACHE_INVALIDATING_CONFIG_KEYS = ('AI_PROVIDER', 'AI_MODEL', 'GOOGLE_MODEL', 'OPENAI_MODEL',
+                                  'OPENROUTER_MODEL', 'OLLAMA_MODEL')
+
+# Optional leading ```/```json fence and trailing ``` fence around a model response
+_FENCE_RE = re.compile(r'^\s*(?:```(?:json)?)?\s*(.*?)\s*(?:```)?\s*$', re.DOTALL)
+
+# How long /api/tags results are reused; failures are cached briefly so a down server isn't re-polled on every refresh
+OLLAMA_MODELS_CACHE_SECONDS = 300
+OLLAMA_MODELS_ERROR_CACHE_SECONDS = 60
+OLLAMA_CONNECT_ERROR = "Error: Cannot connect to Ollama server"
+
+DEFAULT_INSTRUCTIONS = "Suggest improved file names for the following files. Return JSON array with original_path, suggested_name, and confidence (0-100)."
+
+
+@lru_cache(maxsize=32)
+def _prompt_header(base_instructions: str, custom_prompt: Optional[str]) -> str:
+    """Format the instruction block that precedes the file list in a batch prompt."""
+    if custom_prompt:
+        return f"{base_instructions}\n\nAdditional instructions: {custom_prompt}\n\n"
+    return f"{base_instructions}\n\n"
+
+
+def ollama_keep_alive(cfg: Mapping) -> str:
+    """OLLAMA_KEEP_ALIVE (minutes) as an Ollama duration, so the model stays loaded between batches."""
+    try:
+        minutes = int(cfg.get('OLLAMA_KEEP_ALIVE', 5))
+    except (TypeError, ValueError):
+        minutes = 5
+    return f"{max(0, minutes)}m"
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    """Immutable bundle of per-request options passed through the provider handlers."""
+    file_paths: Tuple[str, ...]
+    custom_prompt: Optional[str] = None
+    include_default: bool = True
+    include_filename: bool = True
+    enable_web_search: bool = False
+    enable_tmdb_tool: bool = False
+    enable_openlibrary_tool: bool = False
+    enable_comicvine_tool: bool = False
+    enable_musicbrainz_tool: bool = False
+    enable_library_tool: bool = False
+    enable_pending_tool: bool = False
+    enable_search_queue_tool: bool = False
+    enable_agent_tools: bool = False
+    use_cache: bool = True
 
 
 class AIProcessor:
+    # AI_PROVIDER -> name of the method that sends a batch to that provider
+    _BATCH_HANDLERS = {
+        'openai': '_process_batch_openai',
+        'openrouter': '_process_batch_openrouter',
+        'ollama': '_process_batch_ollama',
+        'google': '_process_batch_google',
+        'custom': '_process_batch_google',
+    }
+    
     def __init__(self, config_manager, library_browser=None, job_store=None):
         self.config_manager = config_manager
         self.library_browser = library_browser
         self.job_store = job_store
-        self.last_api_call_time = 0
+        self.last_api_call_time = 0.0
+        # Serialises the AI_CALL_DELAY_SECONDS gate when batches run concurrently
+        self._rate_limit_lock = threading.Lock()
+        # Caps provider calls in flight across all callers (orchestrator pool, shards, process_batches)
+        # at AI_CONCURRENCY, so nested fan-out cannot exceed what OLLAMA_NUM_PARALLEL is sized for
+        self._provider_calls_cv = threading.Condition()
+        self._provider_calls_in_flight = 0
+        # Shared by every sharded or multi-batch call instead of a pool per call
+        self._batch_pool: Optional[ThreadPoolExecutor] = None
+        self._batch_pool_lock = threading.Lock()
         self.openai_client = None
         self.openrouter_client = None
+        # API keys the cached SDK clients were built with; a key change rebuilds the client
+        self._openai_client_key = None
+        self._openrouter_client_key = None
+        self._client_lock = threading.Lock()
         self.tmdb_client = None
+        self._tmdb_tools_openai = None
         self.openlibrary_client = None
         self.comicvine_client = None
         self.musicbrainz_client = None
+        # (path, mtime_ns, content) of the last instructions file read
+        self._instructions_cache = None
+        # Parsed results of previous requests, persisted so repeats survive restarts
+        self.response_cache = ResponseCache()
+        
+        # Shared keep-alive session so repeated provider calls reuse TCP/TLS connections
+        self.http_session = requests.Session()
+        self.http_session.headers.update({'Connection': 'keep-alive'})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.http_session.mount('http://', adapter)
+        self.http_session.mount('https://', adapter)
         
         self.GOOGLE_MODELS = [
             "gemini-2.5-flash",
@@ -55,14 +190,39 @@ class AIProcessor:
         
         self.ollama_models_cache = []
         self.ollama_models_cache_time = 0
+        self.ollama_models_cache_ttl = OLLAMA_MODELS_CACHE_SECONDS
+        self.ollama_models_cache_url = None
 
-    def _get_tmdb_client(self) -> Optional[TMDBClient]:
+    def get_openai_client(self, api_key: str) -> OpenAI:
+        """Return the shared OpenAI client, rebuilding it only when the API key changes.
+        
+        The SDK retries 429/5xx itself with jittered backoff; it gets the same attempt
+        budget as the REST providers' post_with_retry.
+        """
+        with self._client_lock:
+            if self.openai_client is None or self._openai_client_key != api_key:
+                self.openai_client = OpenAI(api_key=api_key, max_retries=MAX_POST_ATTEMPTS - 1)
+                self._openai_client_key = api_key
+                logger.info("Initialized OpenAI client")
+            return self.openai_client
+    
+    def get_openrouter_client(self, api_key: str) -> OpenAI:
+        """Return the shared OpenRouter client, rebuilding it only when the API key changes."""
+        with self._client_lock:
+            if self.openrouter_client is None or self._openrouter_client_key != api_key:
+                self.openrouter_client = OpenAI(base_url=OPENROUTER_BASE_URL, api_key=api_key, max_retries=MAX_POST_ATTEMPTS - 1)
+                self._openrouter_client_key = api_key
+                logger.info("Initialized OpenRouter client")
+            return self.openrouter_client
+    
+    def _get_tmdb_client(self, cfg: Optional[Mapping] = None) -> Optional[TMDBClient]:
         """Get or initialize TMDB client if enabled and configured."""
-        tmdb_enabled = self.config_manager.get('ENABLE_TMDB_TOOL', False)
+        cfg = self.config_manager if cfg is None else cfg
+        tmdb_enabled = cfg.get('ENABLE_TMDB_TOOL', False)
         if not tmdb_enabled:
             return None
         
-        api_key = self.config_manager.get('TMDB_API_KEY', '')
+        api_key = cfg.get('TMDB_API_KEY', '')
         if not api_key:
             logger.warning("TMDB tool is enabled but TMDB_API_KEY is not configured")
             return None
@@ -74,9 +234,10 @@ class AIProcessor:
         
         return self.tmdb_client
     
-    def _get_openlibrary_client(self) -> Optional[OpenLibraryClient]:
+    def _get_openlibrary_client(self, cfg: Optional[Mapping] = None) -> Optional[OpenLibraryClient]:
         """Get or initialize Open Library client if enabled."""
-        ol_enabled = self.config_manager.get('ENABLE_OPENLIBRARY_TOOL', False)
+        cfg = self.config_manager if cfg is None else cfg
+        ol_enabled = cfg.get('ENABLE_OPENLIBRARY_TOOL', False)
         if not ol_enabled:
             return None
         
@@ -86,13 +247,14 @@ class AIProcessor:
         
         return self.openlibrary_client
     
-    def _get_comicvine_client(self) -> Optional[ComicVineClient]:
+    def _get_comicvine_client(self, cfg: Optional[Mapping] = None) -> Optional[ComicVineClient]:
         """Get or initialize Comic Vine client if enabled and configured."""
-        cv_enabled = self.config_manager.get('ENABLE_COMICVINE_TOOL', False)
+        cfg = self.config_manager if cfg is None else cfg
+        cv_enabled = cfg.get('ENABLE_COMICVINE_TOOL', False)
         if not cv_enabled:
             return None
         
-        api_key = self.config_manager.get('COMICVINE_API_KEY', '')
+        api_key = cfg.get('COMICVINE_API_KEY', '')
         if not api_key:
             logger.warning("Comic Vine tool is enabled but COMICVINE_API_KEY is not configured")
             return None
@@ -103,9 +265,10 @@ class AIProcessor:
         
         return self.comicvine_client
     
-    def _get_musicbrainz_client(self) -> Optional[MusicBrainzClient]:
+    def _get_musicbrainz_client(self, cfg: Optional[Mapping] = None) -> Optional[MusicBrainzClient]:
         """Get or initialize MusicBrainz client if enabled."""
-        mb_enabled = self.config_manager.get('ENABLE_MUSICBRAINZ_TOOL', False)
+        cfg = self.config_manager if cfg is None else cfg
+        mb_enabled = cfg.get('ENABLE_MUSICBRAINZ_TOOL', False)
         if not mb_enabled:
             return None
         
@@ -115,9 +278,9 @@ class AIProcessor:
         
         return self.musicbrainz_client
     
-    def _get_tmdb_tool_definition_google(self) -> Optional[Dict]:
+    def _get_tmdb_tool_definition_google(self, cfg: Optional[Mapping] = None) -> Optional[Dict]:
         """Get TMDB tool definition for Google AI function calling."""
-        if not self._get_tmdb_client():
+        if not self._get_tmdb_client(cfg):
             return None
         
         return {
@@ -175,9 +338,9 @@ class AIProcessor:
             ]
         }
     
-    def _get_openlibrary_tool_definition_google(self) -> Optional[Dict]:
+    def _get_openlibrary_tool_definition_google(self, cfg: Optional[Mapping] = None) -> Optional[Dict]:
         """Get Open Library tool definitions for Google AI function calling."""
-        if not self._get_openlibrary_client():
+        if not self._get_openlibrary_client(cfg):
             return None
         
         return {
@@ -241,9 +404,9 @@ class AIProcessor:
             ]
         }
     
-    def _get_musicbrainz_tool_definition_google(self) -> Optional[Dict]:
+    def _get_musicbrainz_tool_definition_google(self, cfg: Optional[Mapping] = None) -> Optional[Dict]:
         """Get MusicBrainz tool definitions for Google AI function calling."""
-        if not self._get_musicbrainz_client():
+        if not self._get_musicbrainz_client(cfg):
             return None
         
         return {
@@ -333,76 +496,80 @@ class AIProcessor:
             ]
         }
     
-    def _get_tmdb_tools_for_openai(self) -> List[Dict]:
+    def _get_tmdb_tools_for_openai(self, cfg: Optional[Mapping] = None) -> List[Dict]:
         """Get TMDB tool definitions for OpenAI function calling."""
-        if not self._get_tmdb_client():
+        if not self._get_tmdb_client(cfg):
             return []
         
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": "search_movie",
-                    "description": "Search for a movie in The Movie Database (TMDB) to get accurate title, release year, and other metadata. Use this when you need to verify movie information or find release years.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "movie_name": {
-                                "type": "string",
-                                "description": "The name of the movie to search for"
-                            }
-                        },
-                        "required": ["movie_name"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "search_tv_show",
-                    "description": "Search for a TV show in The Movie Database (TMDB) to get accurate title, first air year, and other metadata. Use this when you need to verify TV show information.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "tv_show_name": {
-                                "type": "string",
-                                "description": "The name of the TV show to search for"
-                            }
-                        },
-                        "required": ["tv_show_name"]
+        # The definitions are static, so build them once and hand out shallow copies
+        if self._tmdb_tools_openai is None:
+            self._tmdb_tools_openai = [
+                {
+                    "type": "function",
+                    "function": {
+                        "name": "search_movie",
+                        "description": "Search for a movie in The Movie Database (TMDB) to get accurate title, release year, and other metadata. Use this when you need to verify movie information or find release years.",
+                        "parameters": {
+                            "type": "object",
+                            "properties": {
+                                "movie_name": {
+                                    "type": "string",
+                                    "description": "The name of the movie to search for"
+                                }
+                            },
+                            "required": ["movie_name"]
+                        }
                     }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_tv_episode_info",
-                    "description": "Get detailed episode information for a specific TV show season, including episode titles and air dates. Use this to get accurate episode names and numbers.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "tv_show_name": {
-                                "type": "string",
-                                "description": "The name of the TV show"
+                },
+                {
+                    "type": "function",
+                    "function": {
+                        "name": "search_tv_show",
+                        "description": "Search for a TV show in The Movie Database (TMDB) to get accurate title, first air year, and other metadata. Use this when you need to verify TV show information.",
+                        "parameters": {
+                            "type": "object",
+                            "properties": {
+                                "tv_show_name": {
+                                    "type": "string",
+                                    "description": "The name of the TV show to search for"
+                                }
                             },
-                            "season_number": {
-                                "type": "integer",
-                                "description": "The season number"
+                            "required": ["tv_show_name"]
+                        }
+                    }
+                },
+                {
+                    "type": "function",
+                    "function": {
+                        "name": "get_tv_episode_info",
+                        "description": "Get detailed episode information for a specific TV show season, including episode titles and air dates. Use this to get accurate episode names and numbers.",
+                        "parameters": {
+                            "type": "object",
+                            "properties": {
+                                "tv_show_name": {
+                                    "type": "string",
+                                    "description": "The name of the TV show"
+                                },
+                                "season_number": {
+                                    "type": "integer",
+                                    "description": "The season number"
+                                },
+                                "episode_number": {
+                                    "type": "integer",
+                                    "description": "Optional specific episode number. If omitted, returns all episodes in the season."
+                                }
                             },
-                            "episode_number": {
-                                "type": "integer",
-                                "description": "Optional specific episode number. If omitted, returns all episodes in the season."
-                            }
-                        },
-                        "required": ["tv_show_name", "season_number"]
+                            "required": ["tv_show_name", "season_number"]
+                        }
                     }
                 }
-            }
-        ]
-    
-    def _get_openlibrary_tools_for_openai(self) -> List[Dict]:
+            ]
+        
+        return list(self._tmdb_tools_openai)
+
+    def _get_openlibrary_tools_for_openai(self, cfg: Optional[Mapping] = None) -> List[Dict]:
         """Get Open Library tool definitions for OpenAI/OpenRouter function calling."""
-        if not self._get_openlibrary_client():
+        if not self._get_openlibrary_client(cfg):
             return []
         
         return [
@@ -476,9 +643,9 @@ class AIProcessor:
             }
         ]
     
-    def _get_comicvine_tool_definition_google(self) -> Optional[Dict]:
+    def _get_comicvine_tool_definition_google(self, cfg: Optional[Mapping] = None) -> Optional[Dict]:
         """Get Comic Vine tool definitions for Google AI function calling."""
-        if not self._get_comicvine_client():
+        if not self._get_comicvine_client(cfg):
             return None
         
         return {
@@ -514,9 +681,9 @@ class AIProcessor:
             ]
         }
     
-    def _get_comicvine_tools_for_openai(self) -> List[Dict]:
+    def _get_comicvine_tools_for_openai(self, cfg: Optional[Mapping] = None) -> List[Dict]:
         """Get Comic Vine tool definitions for OpenAI/OpenRouter function calling."""
-        if not self._get_comicvine_client():
+        if not self._get_comicvine_client(cfg):
             return []
         
         return [
@@ -556,9 +723,9 @@ class AIProcessor:
             }
         ]
     
-    def _get_musicbrainz_tools_for_openai(self) -> List[Dict]:
+    def _get_musicbrainz_tools_for_openai(self, cfg: Optional[Mapping] = None) -> List[Dict]:
         """Get MusicBrainz tool definitions for OpenAI/OpenRouter function calling."""
-        if not self._get_musicbrainz_client():
+        if not self._get_musicbrainz_client(cfg):
             return []
         
         return [
@@ -957,9 +1124,9 @@ class AIProcessor:
             }
         ]
     
-    def _execute_tmdb_function(self, function_name: str, args: Dict) -> str:
+    def _execute_tmdb_function(self, function_name: str, args: Dict, cfg: Optional[Mapping] = None) -> str:
         """Execute a TMDB or Open Library function call and return formatted response."""
-        client = self._get_tmdb_client()
+        client = self._get_tmdb_client(cfg)
         
         try:
             if function_name == "search_movie":
@@ -985,7 +1152,7 @@ class AIProcessor:
                 return format_tool_response(result, "episode")
             
             elif function_name in ("search_book", "search_audiobook", "get_book_chapters", "search_author"):
-                ol_client = self._get_openlibrary_client()
+                ol_client = self._get_openlibrary_client(cfg)
                 if not ol_client:
                     return "Open Library tool is not available"
                 
@@ -1006,7 +1173,7 @@ class AIProcessor:
                     return format_openlibrary_response(result, "author")
             
             elif function_name in ("search_comic_volume", "search_comic_issue"):
-                cv_client = self._get_comicvine_client()
+                cv_client = self._get_comicvine_client(cfg)
                 if not cv_client:
                     return "Comic Vine tool is not available"
                 
@@ -1019,7 +1186,7 @@ class AIProcessor:
                     return format_comicvine_response(result, "issue")
             
             elif function_name in ("search_music_artist", "search_music_release", "search_music_release_group", "search_music_track", "get_music_tracks"):
-                mb_client = self._get_musicbrainz_client()
+                mb_client = self._get_musicbrainz_client(cfg)
                 if not mb_client:
                     return "MusicBrainz tool is not available"
                 
@@ -1055,7 +1222,7 @@ class AIProcessor:
                 )
                 if not results:
                     return "No matching files found in library"
-                return json.dumps(results, indent=2)
+                return json_utils.dumps_pretty(results)
             
             elif function_name == "search_pending_jobs":
                 if not self.job_store:
@@ -1066,7 +1233,7 @@ class AIProcessor:
                 )
                 if not results:
                     return "No matching pending jobs found"
-                return json.dumps(results, indent=2)
+                return json_utils.dumps_pretty(results)
 
             elif function_name == "search_queue":
                 if not self.job_store:
@@ -1077,7 +1244,7 @@ class AIProcessor:
                 )
                 if not results:
                     return "No matching queued files found"
-                return json.dumps(results, indent=2)
+                return json_utils.dumps_pretty(results)
 
             elif function_name == "smart_group":
                 if not self.job_store:
@@ -1086,7 +1253,7 @@ class AIProcessor:
                 if not job_ids:
                     return "No job_ids provided for smart_group"
                 result = self.job_store.smart_group_jobs("", job_ids=job_ids)
-                return json.dumps(result, indent=2)
+                return json_utils.dumps_pretty(result)
 
             elif function_name == "set_name":
                 if not self.job_store:
@@ -1115,6 +1282,11 @@ class AIProcessor:
             logger.error(f"Error executing function {function_name}: {e}")
             return f"Error: {str(e)}"
     
+    @staticmethod
+    def _strip_fence(text: str) -> str:
+        """Remove surrounding markdown code fences and whitespace in a single regex pass."""
+        return _FENCE_RE.match(text).group(1)
+
     @staticmethod
     def _extract_json(text: str) -> str:
         """Extract valid JSON array/object from text that may contain surrounding commentary.
@@ -1122,14 +1294,7 @@ class AIProcessor:
         Uses json.JSONDecoder.raw_decode() which correctly handles brackets inside
         JSON strings and returns the position where valid JSON ends.
         """
-        text = text.strip()
-        if text.startswith('```json'):
-            text = text[7:]
-        elif text.startswith('```'):
-            text = text[3:]
-        if text.endswith('```'):
-            text = text[:-3]
-        text = text.strip()
+        text = AIProcessor._strip_fence(text)
         
         if not text:
             return text
@@ -1146,64 +1311,6 @@ class AIProcessor:
         
         return text
 
-    @staticmethod
-    def _repair_truncated_json(raw: str):
-        raw = raw.strip()
-        if not raw:
-            return None
-        last_conf = raw.rfind('"confidence":')
-        if last_conf > 0:
-            brace_pos = raw.rfind('{', last_conf)
-            if brace_pos > 0:
-                cleaned = raw[:brace_pos].rstrip().rstrip(',')
-                cleaned += '\n  ]\n}'
-                try:
-                    json.loads(cleaned)
-                    return cleaned
-                except json.JSONDecodeError:
-                    pass
-        in_string = False
-        for i, ch in enumerate(raw):
-            if ch == '"' and (i == 0 or raw[i-1] != '\\\\'):
-                in_string = not in_string
-        if in_string:
-            cleaned = raw + '"'
-            open_braces = cleaned.count('{') - cleaned.count('}')
-            open_brackets = cleaned.count('[') - cleaned.count(']')
-            cleaned += '}' * max(0, open_braces)
-            cleaned += ']' * max(0, open_brackets)
-            try:
-                json.loads(cleaned)
-                return cleaned
-            except json.JSONDecodeError:
-                pass
-        cleaned = raw.rstrip().rstrip(',').rstrip('\n').rstrip('\r')
-        open_braces = cleaned.count('{') - cleaned.count('}')
-        open_brackets = cleaned.count('[') - cleaned.count(']')
-        cleaned += '}' * max(0, open_braces)
-        cleaned += ']' * max(0, open_brackets)
-        try:
-            json.loads(cleaned)
-            return cleaned
-        except json.JSONDecodeError:
-            pass
-        return None
-
-    @staticmethod
-    def _safe_parse_json(raw: str, context_name: str):
-        try:
-            return json.loads(raw)
-        except json.JSONDecodeError as e:
-            logger.warning(f"Truncated JSON in {context_name}: {e} (raw length={len(raw)})")
-            repaired = AIProcessor._repair_truncated_json(raw)
-            if repaired:
-                try:
-                    return json.loads(repaired)
-                except json.JSONDecodeError:
-                    pass
-            logger.error(f"Unrecoverable JSON in {context_name}: {raw[:200]}...")
-            return None
-    
     def _parse_ai_response(self, text: str, log_prefix: str, on_event: Optional[Callable] = None) -> List[Dict]:
         """Shared response parser for all AI providers.
         
@@ -1219,17 +1326,16 @@ class AIProcessor:
             List of result dicts with original_path, suggested_name, confidence.
             Returns empty list on failure.
         """
-        text = text.strip()
         text = self._extract_json(text)
         
-        logger.debug(f"[{log_prefix}] Parsing AI response as JSON")
+        logger.debug("[%s] Parsing AI response as JSON", log_prefix)
         
         if not text:
             logger.warning(f"[{log_prefix}] Empty response text after extraction")
             return []
         
         try:
-            result = json.loads(text)
+            result = json_utils.loads(text)
         except json.JSONDecodeError as e:
             logger.error(f"[{log_prefix}] Failed to parse JSON response: {e}")
             logger.error(f"[{log_prefix}] Raw text (first 500 chars): {text[:500]}")
@@ -1258,117 +1364,401 @@ class AIProcessor:
         base_path = './instruction_prompt.md'
         instructions_path = custom_path if os.path.exists(custom_path) else base_path
         
+        try:
+            mtime = os.stat(instructions_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        
+        # Only re-read the file when it has been switched or modified since the last call
+        cached = self._instructions_cache
+        if cached is not None and cached[0] == instructions_path and cached[1] == mtime:
+            return cached[2]
+        
         try:
             with open(instructions_path, 'r', encoding='utf-8') as f:
                 content = f.read()
                 logger.info(f"Loaded instructions from {instructions_path}")
-                return content
         except FileNotFoundError:
             logger.warning(f"Instructions file not found at {instructions_path}, using default instructions")
-            return "Suggest improved file names for the following files. Return JSON array with original_path, suggested_name, and confidence (0-100)."
+            content = DEFAULT_INSTRUCTIONS
         except UnicodeDecodeError as e:
             logger.error(f"Unicode decode error reading {instructions_path}: {e}")
             logger.warning("Using default instructions instead")
-            return "Suggest improved file names for the following files. Return JSON array with original_path, suggested_name, and confidence (0-100)."
+            content = DEFAULT_INSTRUCTIONS
+        
+        self._instructions_cache = (instructions_path, mtime, content)
+        return content
 
-    def _prepare_batch_prompt(self, file_paths: List[str], custom_prompt: Optional[str] = None, include_default: bool = True, include_filename: bool = True) -> str:
+    @staticmethod
+    def _common_dir(file_paths) -> str:
+        """Return the directory shared by every path in a multi-file batch, or '' if there is none."""
+        if len(file_paths) < 2:
+            return ""
+        try:
+            common = os.path.commonpath(file_paths)
+        except ValueError:
+            # Mixed absolute/relative paths or different drives
+            return ""
+        # A bare filesystem root saves nothing and would break the slicing below
+        return "" if os.path.dirname(common) == common else common
+    
+    def _prepare_batch_prompt(self, file_paths: List[str], custom_prompt: Optional[str] = None, include_default: bool = True, include_filename: bool = True, shorten_paths: bool = False) -> str:
         base_instructions = self._get_instructions() if include_default else ""
-        
-        if custom_prompt:
-            prompt = f"{base_instructions}\n\nAdditional instructions: {custom_prompt}\n\n"
-        else:
-            prompt = f"{base_instructions}\n\n"
+        header = _prompt_header(base_instructions, custom_prompt)
         
         if include_filename:
-            prompt += "Files to process:\n"
-            for path in file_paths:
-                prompt += f"- {path}\n"
-        else:
-            prompt += f"Number of files to process: {len(file_paths)}\n"
+            common_dir = self._common_dir(file_paths) if shorten_paths else ""
+            if common_dir:
+                # Send the shared folder once instead of repeating it on every line
+                cut = len(common_dir) + 1
+                lines = [f"All files are in the folder: {common_dir}{os.sep}",
+                         "Paths below are relative to that folder; use the same relative path as original_path.",
+                         "Files to process:"]
+                lines.extend(f"- {path[cut:]}" for path in file_paths)
+            else:
+                lines = ["Files to process:"]
+                lines.extend(f"- {path}" for path in file_paths)
+            lines.append("")
+            return header + "\n".join(lines)
         
-        return prompt
+        return f"{header}Number of files to process: {len(file_paths)}\n"
 
-    def process_single(self, file_path: str, custom_prompt: Optional[str] = None, include_default: bool = True, include_filename: bool = True, enable_web_search: bool = False, enable_tmdb_tool: bool = False, enable_openlibrary_tool: bool = False, enable_comicvine_tool: bool = False, enable_musicbrainz_tool: bool = False, enable_library_tool: bool = False, enable_pending_tool: bool = False, enable_search_queue_tool: bool = False, enable_agent_tools: bool = False, on_event: Optional[Callable] = None) -> Optional[Dict]:
+    def process_single(self, file_path: str, custom_prompt: Optional[str] = None, include_default: bool = True, include_filename: bool = True, enable_web_search: bool = False, enable_tmdb_tool: bool = False, enable_openlibrary_tool: bool = False, enable_comicvine_tool: bool = False, enable_musicbrainz_tool: bool = False, enable_library_tool: bool = False, enable_pending_tool: bool = False, enable_search_queue_tool: bool = False, enable_agent_tools: bool = False, use_cache: bool = True, on_event: Optional[Callable] = None) -> Optional[Dict]:
         """Process a single file using configured AI with optional web search and tools."""
         logger.info(f"Starting AI processing for file: {file_path}")
-        logger.debug(f"Custom prompt: {custom_prompt}, Include default: {include_default}, Include filename: {include_filename}, Web search: {enable_web_search}, TMDB tool: {enable_tmdb_tool}, OpenLibrary tool: {enable_openlibrary_tool}, ComicVine tool: {enable_comicvine_tool}, MusicBrainz tool: {enable_musicbrainz_tool}, Library tool: {enable_library_tool}, Pending tool: {enable_pending_tool}, Search Queue: {enable_search_queue_tool}, Agent: {enable_agent_tools}")
         
-        results = self.process_batch([file_path], custom_prompt, include_default, include_filename, enable_web_search, enable_tmdb_tool, enable_openlibrary_tool, enable_comicvine_tool, enable_musicbrainz_tool, enable_library_tool, enable_pending_tool, enable_search_queue_tool, enable_agent_tools, on_event=on_event)
+        req = BatchRequest(
+            file_paths=(file_path,),
+            custom_prompt=custom_prompt,
+            include_default=include_default,
+            include_filename=include_filename,
+            enable_web_search=enable_web_search,
+            enable_tmdb_tool=enable_tmdb_tool,
+            enable_openlibrary_tool=enable_openlibrary_tool,
+            enable_comicvine_tool=enable_comicvine_tool,
+            enable_musicbrainz_tool=enable_musicbrainz_tool,
+            enable_library_tool=enable_library_tool,
+            enable_pending_tool=enable_pending_tool,
+            enable_search_queue_tool=enable_search_queue_tool,
+            enable_agent_tools=enable_agent_tools,
+            use_cache=use_cache,
+        )
+        results = self.process_request(req, on_event=on_event)
         return results[0] if results else None
     
-    def process_batch(self, file_paths: List[str], custom_prompt: Optional[str] = None, include_default: bool = True, include_filename: bool = True, enable_web_search: bool = False, enable_tmdb_tool: bool = False, enable_openlibrary_tool: bool = False, enable_comicvine_tool: bool = False, enable_musicbrainz_tool: bool = False, enable_library_tool: bool = False, enable_pending_tool: bool = False, enable_search_queue_tool: bool = False, enable_agent_tools: bool = False, on_event: Optional[Callable] = None) -> List[Dict]:
-        """Process files using configured AI provider with optional web search and tools."""
-        logger.info(f"Starting AI processing for {len(file_paths)} file(s)")
-        logger.debug(f"Files to process: {file_paths}")
-        logger.debug(f"Custom prompt: {custom_prompt}, Include default: {include_default}, Include filename: {include_filename}, Web search: {enable_web_search}, TMDB tool: {enable_tmdb_tool}, OpenLibrary tool: {enable_openlibrary_tool}, ComicVine tool: {enable_comicvine_tool}, MusicBrainz tool: {enable_musicbrainz_tool}, Library tool: {enable_library_tool}, Pending tool: {enable_pending_tool}, Search Queue: {enable_search_queue_tool}, Agent: {enable_agent_tools}")
-        
-        # Override enable_tmdb_tool based on actual config state (if not explicitly disabled)
-        if enable_tmdb_tool:
-            tmdb_enabled_in_config = self.config_manager.get('ENABLE_TMDB_TOOL', False)
-            if not tmdb_enabled_in_config:
-                logger.warning("TMDB tool requested but not enabled in config, disabling for this request")
-                enable_tmdb_tool = False
-        
-        if enable_openlibrary_tool:
-            ol_enabled_in_config = self.config_manager.get('ENABLE_OPENLIBRARY_TOOL', False)
-            if not ol_enabled_in_config:
-                logger.warning("Open Library tool requested but not enabled in config, disabling for this request")
-                enable_openlibrary_tool = False
-        
-        if enable_comicvine_tool:
-            cv_enabled_in_config = self.config_manager.get('ENABLE_COMICVINE_TOOL', False)
-            if not cv_enabled_in_config:
-                logger.warning("Comic Vine tool requested but not enabled in config, disabling for this request")
-                enable_comicvine_tool = False
-        
-        if enable_musicbrainz_tool:
-            mb_enabled_in_config = self.config_manager.get('ENABLE_MUSICBRAINZ_TOOL', False)
-            if not mb_enabled_in_config:
-                logger.warning("MusicBrainz tool requested but not enabled in config, disabling for this request")
-                enable_musicbrainz_tool = False
-        
-        if enable_library_tool:
-            library_enabled_in_config = self.config_manager.get('ENABLE_LIBRARY_TOOL', False)
-            if not library_enabled_in_config:
-                logger.warning("Library tool requested but not enabled in config, disabling for this request")
-                enable_library_tool = False
-        
-        if enable_pending_tool:
-            pending_enabled_in_config = self.config_manager.get('ENABLE_PENDING_TOOL', False)
-            if not pending_enabled_in_config:
-                logger.warning("Pending tool requested but not enabled in config, disabling for this request")
-                enable_pending_tool = False
-        
-        provider = self.config_manager.get('AI_PROVIDER', 'google')
+    def process_batch(self, file_paths: List[str], custom_prompt: Optional[str] = None, include_default: bool = True, include_filename: bool = True, enable_web_search: bool = False, enable_tmdb_tool: bool = False, enable_openlibrary_tool: bool = False, enable_comicvine_tool: bool = False, enable_musicbrainz_tool: bool = False, enable_library_tool: bool = False, enable_pending_tool: bool = False, enable_search_queue_tool: bool = False, enable_agent_tools: bool = False, use_cache: bool = True, on_event: Optional[Callable] = None) -> List[Dict]:
+        """Process files using configured AI provider with optional web search and tools.
+        
+        Duplicate paths are sent once and their result is repeated at each position.
+        Batches larger than SHARD_SIZE are split into shards that are sent concurrently.
+        """
+        unique_paths = tuple(dict.fromkeys(file_paths))
+        req = BatchRequest(
+            file_paths=unique_paths,
+            custom_prompt=custom_prompt,
+            include_default=include_default,
+            include_filename=include_filename,
+            enable_web_search=enable_web_search,
+            enable_tmdb_tool=enable_tmdb_tool,
+            enable_openlibrary_tool=enable_openlibrary_tool,
+            enable_comicvine_tool=enable_comicvine_tool,
+            enable_musicbrainz_tool=enable_musicbrainz_tool,
+            enable_library_tool=enable_library_tool,
+            enable_pending_tool=enable_pending_tool,
+            enable_search_queue_tool=enable_search_queue_tool,
+            enable_agent_tools=enable_agent_tools,
+            use_cache=use_cache,
+        )
+        
+        if len(unique_paths) < len(file_paths):
+            logger.info(f"Dropped {len(file_paths) - len(unique_paths)} duplicate path(s) from batch")
+        
+        shards = self._shard(req.file_paths, int(self.config_manager.get('SHARD_SIZE', 40)))
+        if len(shards) == 1:
+            results = self.process_request(req, on_event=on_event)
+        else:
+            results = self._process_shards(req, shards, on_event)
+        
+        if len(unique_paths) == len(file_paths) or len(results) != len(unique_paths):
+            return results
+        # Callers match results to files by position, so expand back to the original list
+        result_by_path = dict(zip(unique_paths, results))
+        return [dict(result_by_path[path]) if isinstance(result_by_path[path], dict) else result_by_path[path] for path in file_paths]
+    
+    @staticmethod
+    def _shard(paths, size: int) -> List[Tuple[str, ...]]:
+        """Split paths into consecutive chunks of at most size entries (a single chunk if size <= 0)."""
+        paths = tuple(paths)
+        if size <= 0 or len(paths) <= size:
+            return [paths]
+        return [paths[i:i + size] for i in range(0, len(paths), size)]
+    
+    def _process_shards(self, req: BatchRequest, shards: List[Tuple[str, ...]], on_event: Optional[Callable] = None) -> List[Dict]:
+        """Send each shard of a large batch as its own request and merge the results in input order.
+        
+        Shards run concurrently (see process_batches). Shards that fail or come back with the
+        wrong number of results are retried once; if one still fails the whole batch raises,
+        since callers match results to files by position.
+        """
+        logger.info(f"Splitting {len(req.file_paths)} files into {len(shards)} shards of up to {len(shards[0])}")
+        shard_reqs = [replace(req, file_paths=shard) for shard in shards]
+        results = self._run_requests(shard_reqs, on_event)
+        
+        failed = [i for i, res in enumerate(results) if res is None or len(res) != len(shards[i])]
+        if failed:
+            logger.warning(f"Retrying {len(failed)} of {len(shards)} shards")
+            # Bypass the cache so the retry really asks the provider again
+            retry_reqs = [replace(shard_reqs[i], use_cache=False) for i in failed]
+            for i, res in zip(failed, self._run_requests(retry_reqs, on_event)):
+                if res is None or len(res) != len(shards[i]):
+                    raise ValueError(f"Shard {i + 1}/{len(shards)} of {len(shards[i])} files failed after retry")
+                results[i] = res
+        
+        return [item for res in results for item in res]
+    
+    def _acquire_provider_slot(self, cfg: Mapping):
+        """Block until fewer than AI_CONCURRENCY provider calls are in flight, then take a slot."""
+        limit = max(1, int(cfg.get('AI_CONCURRENCY', 4)))
+        with self._provider_calls_cv:
+            while self._provider_calls_in_flight >= limit:
+                self._provider_calls_cv.wait()
+            self._provider_calls_in_flight += 1
+    
+    def _release_provider_slot(self):
+        with self._provider_calls_cv:
+            self._provider_calls_in_flight -= 1
+            self._provider_calls_cv.notify()
+    
+    def _get_batch_pool(self) -> ThreadPoolExecutor:
+        """Return the shared executor for sharded and multi-batch requests, creating it on first use."""
+        with self._batch_pool_lock:
+            if self._batch_pool is None:
+                max_workers = max(1, int(self.config_manager.get('AI_CONCURRENCY', 4)))
+                self._batch_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-batch")
+            return self._batch_pool
+    
+    def _run_requests(self, reqs: List[BatchRequest], on_event: Optional[Callable] = None) -> List[Optional[List[Dict]]]:
+        """Run requests concurrently on the shared batch pool. Returns results in order, None for a request that raised.
+        
+        Provider calls still wait for a slot in process_request, so the total in flight stays at AI_CONCURRENCY.
+        """
+        def run(req):
+            try:
+                return self.process_request(req, on_event=on_event)
+            except Exception as e:
+                logger.error(f"Batch of {len(req.file_paths)} files failed: {type(e).__name__}: {e}")
+                return None
+        
+        if len(reqs) == 1:
+            return [run(reqs[0])]
+        return list(self._get_batch_pool().map(run, reqs))
+    
+    def process_batches(self, batches: List[List[str]], on_event: Optional[Callable] = None, **options) -> List[List[Dict]]:
+        """Process several independent batches concurrently.
+        
+        Runs up to AI_CONCURRENCY batches at once; AI_CALL_DELAY_SECONDS is still
+        enforced globally between request starts. Accepts the same keyword options
+        as process_batch; each batch is sent as one request, without sharding.
+        Returns one result list per input batch, in order, with an empty list for
+        any batch that failed.
+        """
+        if not batches:
+            return []
+        
+        logger.info(f"Processing {len(batches)} batches with up to {self.config_manager.get('AI_CONCURRENCY', 4)} concurrent AI calls")
+        reqs = [BatchRequest(file_paths=tuple(file_paths), **options) for file_paths in batches]
+        return [res or [] for res in self._run_requests(reqs, on_event)]
+    
+    def process_request(self, req: BatchRequest, on_event: Optional[Callable] = None) -> List[Dict]:
+        """Process a prepared BatchRequest using the configured AI provider."""
+        # Read the config once per request so every handler sees a consistent view
+        cfg = self.config_manager.snapshot()
+        logger.info(f"Starting AI processing for {len(req.file_paths)} file(s)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Files to process: %s", list(req.file_paths))
+            logger.debug("Request options: %s", req)
+        
+        # Override tool flags based on actual config state (if not explicitly disabled)
+        overrides = {}
+        if req.enable_tmdb_tool and not cfg.get('ENABLE_TMDB_TOOL', False):
+            logger.warning("TMDB tool requested but not enabled in config, disabling for this request")
+            overrides['enable_tmdb_tool'] = False
+        
+        if req.enable_openlibrary_tool and not cfg.get('ENABLE_OPENLIBRARY_TOOL', False):
+            logger.warning("Open Library tool requested but not enabled in config, disabling for this request")
+            overrides['enable_openlibrary_tool'] = False
+        
+        if req.enable_comicvine_tool and not cfg.get('ENABLE_COMICVINE_TOOL', False):
+            logger.warning("Comic Vine tool requested but not enabled in config, disabling for this request")
+            overrides['enable_comicvine_tool'] = False
+        
+        if req.enable_musicbrainz_tool and not cfg.get('ENABLE_MUSICBRAINZ_TOOL', False):
+            logger.warning("MusicBrainz tool requested but not enabled in config, disabling for this request")
+            overrides['enable_musicbrainz_tool'] = False
+        
+        if req.enable_library_tool and not cfg.get('ENABLE_LIBRARY_TOOL', False):
+            logger.warning("Library tool requested but not enabled in config, disabling for this request")
+            overrides['enable_library_tool'] = False
+        
+        if req.enable_pending_tool and not cfg.get('ENABLE_PENDING_TOOL', False):
+            logger.warning("Pending tool requested but not enabled in config, disabling for this request")
+            overrides['enable_pending_tool'] = False
+        
+        if overrides:
+            req = replace(req, **overrides)
+        
+        provider = cfg.get('AI_PROVIDER', 'google')
         logger.info(f"Using AI provider: {provider}")
         
-        if provider == 'openai':
-            return self._process_batch_openai(file_paths, custom_prompt, include_default, include_filename, enable_web_search, enable_tmdb_tool, enable_openlibrary_tool, enable_comicvine_tool, enable_musicbrainz_tool, enable_library_tool, enable_pending_tool, enable_search_queue_tool, enable_agent_tools, on_event=on_event)
-        elif provider == "openrouter":
-            return self._process_batch_openrouter(file_paths, custom_prompt, include_default, include_filename, enable_web_search, enable_tmdb_tool, enable_openlibrary_tool, enable_comicvine_tool, enable_musicbrainz_tool, enable_library_tool, enable_pending_tool, enable_search_queue_tool, enable_agent_tools, on_event=on_event)
-        elif provider == "ollama":
-            return self._process_batch_ollama(file_paths, custom_prompt, include_default, include_filename, enable_web_search, enable_tmdb_tool, enable_openlibrary_tool, enable_comicvine_tool, enable_musicbrainz_tool, enable_library_tool, enable_pending_tool, enable_search_queue_tool, enable_agent_tools, on_event=on_event)
-        elif provider == "google" or provider == "custom":
-            return self._process_batch_google(file_paths, custom_prompt, include_default, include_filename, enable_web_search, enable_tmdb_tool, enable_openlibrary_tool, enable_comicvine_tool, enable_musicbrainz_tool, enable_library_tool, enable_pending_tool, enable_search_queue_tool, enable_agent_tools, on_event=on_event)
+        handler_name = self._BATCH_HANDLERS.get(provider)
+        if handler_name is None:
+            logger.error(f"Unknown AI provider: {provider}")
+            return []
+        handler = getattr(self, handler_name)
+        
+        # Built once here and handed to the handler, which would otherwise rebuild it.
+        # Agent tools look jobs up by the path the model echoes, so they keep full paths.
+        shorten_paths = not req.enable_agent_tools
+        prompt = self._prepare_batch_prompt(req.file_paths, req.custom_prompt, req.include_default, req.include_filename, shorten_paths=shorten_paths)
+        common_dir = self._common_dir(req.file_paths) if shorten_paths and req.include_filename else ""
+        
+        cache_ttl = float(cfg.get('AI_CACHE_TTL_SECONDS', 3600))
+        # Library, pending and queue tools answer from live state the cache key does not cover
+        uses_live_state = (req.enable_library_tool or req.enable_pending_tool
+                           or req.enable_search_queue_tool or req.enable_agent_tools)
+        cache_key = None
+        if cache_ttl > 0 and not uses_live_state:
+            cache_key = self._response_cache_key(req, provider, cfg, prompt)
+        if cache_key is not None and req.use_cache:
+            cached = self.response_cache.get(cache_key, cache_ttl)
+            if cached is not None:
+                logger.info(f"Using cached AI response for {len(req.file_paths)} file(s)")
+                if on_event:
+                    on_event({"type": "thinking", "message": "Reused cached AI response"})
+                return cached
+        
+        self._acquire_provider_slot(cfg)
+        try:
+            results = handler(req, on_event=on_event, cfg=cfg, prompt=prompt)
+        finally:
+            self._release_provider_slot()
+        if common_dir:
+            self._restore_common_dir(results, common_dir)
+        
+        # Only keep complete answers; a short or malformed one would be replayed until the TTL expires
+        complete = (isinstance(results, list) and len(results) == len(req.file_paths)
+                    and all(isinstance(r, dict) and r.get('suggested_name') for r in results))
+        if cache_key is not None and complete:
+            self.response_cache.set(cache_key, results)
+        return results
+    
+    @staticmethod
+    def _restore_common_dir(results: List[Dict], common_dir: str):
+        """Re-prefix original_path in results produced from a prompt that omitted the shared folder."""
+        # Match on a whole path component so a sibling such as "Show Extras" is not mistaken for "Show"
+        prefixes = tuple({common_dir + os.sep, common_dir + '/'})
+        for result in results:
+            if not isinstance(result, dict):
+                continue
+            original_path = result.get('original_path')
+            if isinstance(original_path, str) and original_path != common_dir and not original_path.startswith(prefixes):
+                result['original_path'] = os.path.join(common_dir, original_path)
+    
+    @staticmethod
+    def _response_cache_key(req: BatchRequest, provider: str, cfg: Mapping, prompt: str) -> str:
+        """Digest everything that shapes the answer: provider, model, full prompt and tool options.
+        
+        Whitespace is collapsed first, so re-wrapping or re-indenting a custom prompt
+        still hits the cache; any change to the actual words is a new key.
+        """
+        custom_prompt = " ".join(req.custom_prompt.split()) if req.custom_prompt else req.custom_prompt
+        material = repr((provider, cfg.get('AI_MODEL'), " ".join(prompt.split()),
+                         replace(req, use_cache=True, custom_prompt=custom_prompt)))
+        return hashlib.blake2b(material.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def invalidate_cache(self) -> int:
+        """Forget all cached AI responses."""
+        removed = self.response_cache.clear()
+        logger.info(f"Cleared {removed} cached AI response(s)")
+        return removed
     
-    def _process_batch_google(self, file_paths: List[str], custom_prompt: Optional[str] = None, include_default: bool = True, include_filename: bool = True, enable_web_search: bool = False, enable_tmdb_tool: bool = False, enable_openlibrary_tool: bool = False, enable_comicvine_tool: bool = False, enable_musicbrainz_tool: bool = False, enable_library_tool: bool = False, enable_pending_tool: bool = False, enable_search_queue_tool: bool = False, enable_agent_tools: bool = False, on_event: Optional[Callable] = None) -> List[Dict]:
+    def _wait_for_rate_limit(self, cfg: Mapping):
+        """Sleep out whatever remains of AI_CALL_DELAY_SECONDS since the last provider call.
+        
+        Handlers call this immediately before sending, so time spent building the
+        prompt, tool list and payload counts towards the delay instead of adding to it.
+        """
+        delay_seconds = cfg.get('AI_CALL_DELAY_SECONDS', 2)
+        with self._rate_limit_lock:
+            time_since_last_call = time.monotonic() - self.last_api_call_time
+            
+            if time_since_last_call < delay_seconds:
+                wait_time = delay_seconds - time_since_last_call
+                logger.info(f"Rate limit protection: waiting {wait_time:.2f} seconds before API call")
+                time.sleep(wait_time)
+            
+            # Claim this slot before releasing the lock so concurrent callers queue behind it
+            self.last_api_call_time = time.monotonic()
+
+    def post_with_retry(self, url: str, payload: Dict, log_prefix: str, timeout: Optional[float] = None, on_event: Optional[Callable] = None, stream: bool = False, headers: Optional[Dict] = None) -> requests.Response:
+        """POST to a provider, retrying 429/5xx and connection errors with exponential backoff and full jitter.
+
+        Read timeouts are not retried: the provider may already be generating (and billing) the answer.
+        """
+        # Serialise once up front (with orjson when available) rather than letting requests json.dumps each attempt
+        body = json_utils.encode_body(payload)
+        headers = headers or JSON_HEADERS
+        for attempt in range(1, MAX_POST_ATTEMPTS + 1):
+            try:
+                response = self.http_session.post(url, data=body, headers=headers, timeout=timeout, stream=stream)
+            except requests.exceptions.ConnectionError as e:
+                # Also covers ConnectTimeout; a ReadTimeout propagates to the caller's Timeout handler
+                if attempt == MAX_POST_ATTEMPTS:
+                    raise
+                reason = type(e).__name__
+                retry_after = None
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt == MAX_POST_ATTEMPTS:
+                    return response
+                reason = f"status {response.status_code}"
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+            
+            # Full jitter: sleep a random amount up to the exponential cap, unless the server told us how long
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+            if retry_after:
+                try:
+                    delay = max(delay, min(float(retry_after), BACKOFF_MAX_SECONDS))
+                except ValueError:
+                    pass
+            
+            logger.warning(f"{log_prefix} API request failed ({reason}), retrying in {delay:.1f}s (attempt {attempt}/{MAX_POST_ATTEMPTS})")
+            if on_event:
+                on_event({"type": "retry", "attempt": attempt, "delay_seconds": round(delay, 1), "reason": reason})
+            time.sleep(delay)
+
+    def _process_batch_google(self, req: BatchRequest, on_event: Optional[Callable] = None, cfg: Optional[Mapping] = None, prompt: Optional[str] = None) -> List[Dict]:
         """Process files using Google AI with optional web search and tools."""
-        api_key = self.config_manager.get('GOOGLE_API_KEY', '')
+        cfg = self.config_manager.snapshot() if cfg is None else cfg
+        api_key = cfg.get('GOOGLE_API_KEY', '')
         if not api_key:
             logger.error("GOOGLE_API_KEY not found in configuration")
             raise ValueError("GOOGLE_API_KEY not set. Please configure it in Settings.")
         
-        model = self.config_manager.get('AI_MODEL', 'gemini-2.5-flash')
+        model = cfg.get('AI_MODEL', 'gemini-2.5-flash')
         logger.info(f"Using AI model: {model}")
-        prompt = self._prepare_batch_prompt(file_paths, custom_prompt, include_default, include_filename)
+        if prompt is None:
+            prompt = self._prepare_batch_prompt(req.file_paths, req.custom_prompt, req.include_default, req.include_filename)
         
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
+        # The key travels in a header so it stays out of the URL, logs and HTTPError messages
+        url = GOOGLE_GENERATE_URL.format(model=model)
+        headers = {**JSON_HEADERS, 'x-goog-api-key': api_key}
         
         # Get Google AI parameters from config with defaults
-        temperature = float(self.config_manager.get('GOOGLE_TEMPERATURE', 0.1))
-        max_tokens = int(self.config_manager.get('GOOGLE_MAX_TOKENS', 2048))
-        top_k = int(self.config_manager.get('GOOGLE_TOP_K', 1))
-        top_p = float(self.config_manager.get('GOOGLE_TOP_P', 1))
+        temperature = float(cfg.get('GOOGLE_TEMPERATURE', 0.1))
+        max_tokens = int(cfg.get('GOOGLE_MAX_TOKENS', 2048))
+        top_k = int(cfg.get('GOOGLE_TOP_K', 1))
+        top_p = float(cfg.get('GOOGLE_TOP_P', 1))
         
         # Build base payload
         payload = {
@@ -1385,35 +1775,35 @@ class AIProcessor:
         
         # Add tools if enabled
         tools = []
-        if enable_web_search:
+        if req.enable_web_search:
             tools.append({"google_search": {}})
         
-        if enable_tmdb_tool:
-            tmdb_tool = self._get_tmdb_tool_definition_google()
+        if req.enable_tmdb_tool:
+            tmdb_tool = self._get_tmdb_tool_definition_google(cfg)
             if tmdb_tool:
                 tools.append(tmdb_tool)
         
-        if enable_openlibrary_tool:
-            ol_tool = self._get_openlibrary_tool_definition_google()
+        if req.enable_openlibrary_tool:
+            ol_tool = self._get_openlibrary_tool_definition_google(cfg)
             if ol_tool:
                 tools.append(ol_tool)
         
-        if enable_comicvine_tool:
-            cv_tool = self._get_comicvine_tool_definition_google()
+        if req.enable_comicvine_tool:
+            cv_tool = self._get_comicvine_tool_definition_google(cfg)
             if cv_tool:
                 tools.append(cv_tool)
         
-        if enable_musicbrainz_tool:
-            mb_tool = self._get_musicbrainz_tool_definition_google()
+        if req.enable_musicbrainz_tool:
+            mb_tool = self._get_musicbrainz_tool_definition_google(cfg)
             if mb_tool:
                 tools.append(mb_tool)
         
-        if enable_library_tool:
+        if req.enable_library_tool:
             lib_tool = self._get_library_tool_definition_google()
             if lib_tool:
                 tools.append(lib_tool)
         
-        if enable_pending_tool:
+        if req.enable_pending_tool:
             pend_tool = self._get_pending_tool_definition_google()
             if pend_tool:
                 tools.append(pend_tool)
@@ -1422,43 +1812,32 @@ class AIProcessor:
             payload["tools"] = tools
         
         try:
-            # Enforce delay between API calls
-            delay_seconds = self.config_manager.get('AI_CALL_DELAY_SECONDS', 2)
-            time_since_last_call = time.time() - self.last_api_call_time
-            
-            if time_since_last_call < delay_seconds:
-                wait_time = delay_seconds - time_since_last_call
-                logger.info(f"Rate limit protection: waiting {wait_time:.2f} seconds before API call")
-                time.sleep(wait_time)
-            
             logger.info(f"Sending request to Google AI API: {model}")
             
             if on_event:
                 tools_active = []
-                if enable_web_search: tools_active.append("web_search")
-                if enable_tmdb_tool: tools_active.append("tmdb")
-                if enable_openlibrary_tool: tools_active.append("openlibrary")
-                if enable_comicvine_tool: tools_active.append("comicvine")
-                if enable_musicbrainz_tool: tools_active.append("musicbrainz")
-                if enable_library_tool: tools_active.append("library")
-                if enable_pending_tool: tools_active.append("pending")
+                if req.enable_web_search: tools_active.append("web_search")
+                if req.enable_tmdb_tool: tools_active.append("tmdb")
+                if req.enable_openlibrary_tool: tools_active.append("openlibrary")
+                if req.enable_comicvine_tool: tools_active.append("comicvine")
+                if req.enable_musicbrainz_tool: tools_active.append("musicbrainz")
+                if req.enable_library_tool: tools_active.append("library")
+                if req.enable_pending_tool: tools_active.append("pending")
                 on_event({"type": "api_request", "provider": "google", "model": model, "tools": tools_active})
             
-            logger.debug(f"API URL: {url.split('?')[0]}")  # Log URL without API key
-            logger.debug(f"Payload config: temperature={payload['generationConfig']['temperature']}, maxTokens={payload['generationConfig']['maxOutputTokens']}")
+            logger.debug("API URL: %s", url)
+            logger.debug("Payload config: temperature=%s, maxTokens=%s", payload['generationConfig']['temperature'], payload['generationConfig']['maxOutputTokens'])
             
             # Log full request payload (without API key)
-            logger.info("=" * 80)
-            logger.info("GOOGLE AI API REQUEST")
-            logger.info("=" * 80)
-            logger.info(f"Model: {model}")
-            logger.info(f"Web Search Enabled: {enable_web_search}")
-            logger.debug(f"Prompt (first 500 chars): {prompt[:500]}...")
-            logger.debug(f"Full Prompt:\n{prompt}")
-            logger.debug(f"Generation Config: {json.dumps(payload['generationConfig'], indent=2)}")
-            if 'tools' in payload:
-                logger.debug(f"Tools: {json.dumps(payload['tools'], indent=2)}")
-            logger.info("=" * 80)
+            if logger.isEnabledFor(logging.INFO):
+                _log_banner("GOOGLE AI API REQUEST", f"Model: {model}", f"Web Search Enabled: {req.enable_web_search}")
+                logger.debug("Prompt (first 500 chars): %s...", prompt[:500])
+                logger.debug("Full Prompt:\n%s", prompt)
+                logger.debug("Generation Config: %s", _LazyJson(payload['generationConfig']))
+                if 'tools' in payload:
+                    logger.debug("Tools: %s", _LazyJson(payload['tools']))
+            
+            self._wait_for_rate_limit(cfg)
             
             # Handle multi-turn conversation for function calling
             conversation_history = payload["contents"].copy()
@@ -1466,9 +1845,9 @@ class AIProcessor:
             
             for turn in range(max_turns):
                 req_start = time.time()
-                response = requests.post(url, json=payload)
+                response = self.post_with_retry(url, payload, "Google", on_event=on_event, headers=headers)
                 req_duration = int((time.time() - req_start) * 1000)
-                self.last_api_call_time = time.time()
+                self.last_api_call_time = time.monotonic()
                 response.raise_for_status()
                 
                 logger.info(f"Received successful response from Google AI API (status: {response.status_code})")
@@ -1476,17 +1855,20 @@ class AIProcessor:
                 if on_event:
                     on_event({"type": "api_response", "turn": turn + 1, "duration_ms": req_duration})
                 
+                data = json_utils.loads(response.content)
+                
                 # Log full response
-                logger.info("=" * 80)
-                logger.info(f"GOOGLE AI API RESPONSE (Turn {turn + 1})")
-                logger.info("=" * 80)
-                logger.info(f"Status Code: {response.status_code}")
-                logger.debug(f"Full Response:\n{json.dumps(response.json(), indent=2)}")
-                logger.info("=" * 80)
+                if logger.isEnabledFor(logging.INFO):
+                    _log_banner(f"GOOGLE AI API RESPONSE (Turn {turn + 1})", f"Status Code: {response.status_code}")
+                    logger.debug("Full Response:\n%s", _LazyJson(data))
                 
-                data = response.json()
-                candidate = data['candidates'][0]
-                parts = candidate['content']['parts']
+                # A blocked prompt comes back without candidates; report why instead of a bare KeyError
+                candidates = data.get('candidates')
+                if not candidates:
+                    block_reason = data.get('promptFeedback', {}).get('blockReason', 'unknown')
+                    raise ValueError(f"Google API returned no candidates (block reason: {block_reason})")
+                candidate = candidates[0]
+                parts = candidate.get('content', {}).get('parts', [])
                 
                 # Check if there are function calls
                 function_calls = [part for part in parts if 'functionCall' in part]
@@ -1503,10 +1885,10 @@ class AIProcessor:
                         func_name = fc['functionCall']['name']
                         func_args = fc['functionCall'].get('args', {})
                         
-                        logger.debug(f"Executing function: {func_name} with args: {func_args}")
+                        logger.debug("Executing function: %s with args: %s", func_name, func_args)
                         if on_event:
                             on_event({"type": "tool_started", "tool": func_name, "args": json.dumps(func_args)})
-                        result = self._execute_tmdb_function(func_name, func_args)
+                        result = self._execute_tmdb_function(func_name, func_args, cfg)
                         if on_event:
                             on_event({"type": "tool_completed", "tool": func_name})
                         
@@ -1522,7 +1904,7 @@ class AIProcessor:
                     payload["contents"] = conversation_history
                     
                     # Enforce delay before next API call
-                    delay_seconds = self.config_manager.get('AI_CALL_DELAY_SECONDS', 2)
+                    delay_seconds = cfg.get('AI_CALL_DELAY_SECONDS', 2)
                     logger.info(f"Waiting {delay_seconds} seconds before next API call")
                     time.sleep(delay_seconds)
                     
@@ -1535,7 +1917,7 @@ class AIProcessor:
                     return []
                 
                 text = ''.join(text_parts)
-                logger.debug(f"Raw AI response length: {len(text)} characters")
+                logger.debug("Raw AI response length: %s characters", len(text))
                 
                 return self._parse_ai_response(text, "Google", on_event)
             
@@ -1561,109 +1943,100 @@ class AIProcessor:
                 on_event({"type": "error", "message": str(e)})
             raise
 
-    def _process_batch_openai(self, file_paths: List[str], custom_prompt: Optional[str] = None, include_default: bool = True, include_filename: bool = True, enable_web_search: bool = False, enable_tmdb_tool: bool = False, enable_openlibrary_tool: bool = False, enable_comicvine_tool: bool = False, enable_musicbrainz_tool: bool = False, enable_library_tool: bool = False, enable_pending_tool: bool = False, enable_search_queue_tool: bool = False, enable_agent_tools: bool = False, on_event: Optional[Callable] = None) -> List[Dict]:
+    def _process_batch_openai(self, req: BatchRequest, on_event: Optional[Callable] = None, cfg: Optional[Mapping] = None, prompt: Optional[str] = None) -> List[Dict]:
         """Process files using OpenAI with optional web search."""
-        api_key = self.config_manager.get('OPENAI_API_KEY', '')
+        cfg = self.config_manager.snapshot() if cfg is None else cfg
+        api_key = cfg.get('OPENAI_API_KEY', '')
         if not api_key:
             logger.error("OPENAI_API_KEY not found in configuration")
             raise ValueError("OPENAI_API_KEY not set. Please configure it in Settings.")
         
-        # Initialize OpenAI client with API key
-        if not self.openai_client or os.environ.get('OPENAI_API_KEY') != api_key:
-            os.environ['OPENAI_API_KEY'] = api_key
-            self.openai_client = OpenAI()
-            logger.info("Initialized OpenAI client")
+        client = self.get_openai_client(api_key)
         
-        model = self.config_manager.get('AI_MODEL', 'gpt-5-mini')
+        model = cfg.get('AI_MODEL', 'gpt-5-mini')
         logger.info(f"Using OpenAI model: {model}")
-        prompt = self._prepare_batch_prompt(file_paths, custom_prompt, include_default, include_filename)
+        if prompt is None:
+            prompt = self._prepare_batch_prompt(req.file_paths, req.custom_prompt, req.include_default, req.include_filename)
         
         try:
-            # Enforce delay between API calls to avoid rate limiting
-            delay_seconds = self.config_manager.get('AI_CALL_DELAY_SECONDS', 2)
-            time_since_last_call = time.time() - self.last_api_call_time
-            
-            if time_since_last_call < delay_seconds:
-                wait_time = delay_seconds - time_since_last_call
-                logger.info(f"Rate limit protection: waiting {wait_time:.2f} seconds before API call")
-                time.sleep(wait_time)
-            
             logger.info(f"Sending request to OpenAI API: {model}")
             
             if on_event:
                 tools_active = []
-                if enable_web_search: tools_active.append("web_search")
-                if enable_tmdb_tool: tools_active.append("tmdb")
-                if enable_openlibrary_tool: tools_active.append("openlibrary")
-                if enable_comicvine_tool: tools_active.append("comicvine")
-                if enable_musicbrainz_tool: tools_active.append("musicbrainz")
-                if enable_library_tool: tools_active.append("library")
-                if enable_pending_tool: tools_active.append("pending")
+                if req.enable_web_search: tools_active.append("web_search")
+                if req.enable_tmdb_tool: tools_active.append("tmdb")
+                if req.enable_openlibrary_tool: tools_active.append("openlibrary")
+                if req.enable_comicvine_tool: tools_active.append("comicvine")
+                if req.enable_musicbrainz_tool: tools_active.append("musicbrainz")
+                if req.enable_library_tool: tools_active.append("library")
+                if req.enable_pending_tool: tools_active.append("pending")
                 on_event({"type": "api_request", "provider": "openai", "model": model, "tools": tools_active})
             
             # Build tools list - only TMDB supported (web search not available in standard OpenAI API)
             tools = []
             use_chat_api = False
             
-            if enable_web_search:
+            if req.enable_web_search:
                 logger.warning("Web search is not supported with OpenAI API. Consider using Google AI or adding TMDB tool for metadata lookup.")
             
-            if enable_tmdb_tool:
-                tmdb_tools = self._get_tmdb_tools_for_openai()
+            if req.enable_tmdb_tool:
+                tmdb_tools = self._get_tmdb_tools_for_openai(cfg)
                 if tmdb_tools:
                     tools.extend(tmdb_tools)
                 use_chat_api = True
             
-            if enable_openlibrary_tool:
-                ol_tools = self._get_openlibrary_tools_for_openai()
+            if req.enable_openlibrary_tool:
+                ol_tools = self._get_openlibrary_tools_for_openai(cfg)
                 if ol_tools:
                     tools.extend(ol_tools)
                 use_chat_api = True
             
-            if enable_comicvine_tool:
-                cv_tools = self._get_comicvine_tools_for_openai()
+            if req.enable_comicvine_tool:
+                cv_tools = self._get_comicvine_tools_for_openai(cfg)
                 if cv_tools:
                     tools.extend(cv_tools)
                     use_chat_api = True
             
-            if enable_musicbrainz_tool:
-                mb_tools = self._get_musicbrainz_tools_for_openai()
+            if req.enable_musicbrainz_tool:
+                mb_tools = self._get_musicbrainz_tools_for_openai(cfg)
                 if mb_tools:
                     tools.extend(mb_tools)
                 use_chat_api = True
             
-            if enable_library_tool:
+            if req.enable_library_tool:
                 lib_tools = self._get_library_tools_for_openai()
                 if lib_tools:
                     tools.extend(lib_tools)
                 use_chat_api = True
             
-            if enable_pending_tool:
+            if req.enable_pending_tool:
                 pend_tools = self._get_pending_tools_for_openai()
                 if pend_tools:
                     tools.extend(pend_tools)
                 use_chat_api = True
             
             # Log full request
-            logger.info("=" * 80)
-            logger.info("OPENAI API REQUEST")
-            logger.info("=" * 80)
-            logger.info(f"Model: {model}")
-            logger.info(f"Web Search Enabled: {enable_web_search}")
-            logger.info(f"TMDB Tool Enabled: {enable_tmdb_tool}")
-            logger.info(f"API: {'chat.completions' if use_chat_api else 'responses'}")
-            logger.debug(f"Prompt (first 500 chars): {prompt[:500]}...")
-            logger.debug(f"Full Prompt:\n{prompt}")
-            if tools:
-                logger.debug(f"Tools: {json.dumps(tools, indent=2)}")
-            logger.info("=" * 80)
+            if logger.isEnabledFor(logging.INFO):
+                _log_banner(
+                    "OPENAI API REQUEST",
+                    f"Model: {model}",
+                    f"Web Search Enabled: {req.enable_web_search}",
+                    f"TMDB Tool Enabled: {req.enable_tmdb_tool}",
+                    f"API: {'chat.completions' if use_chat_api else 'responses'}"
+                )
+                logger.debug("Prompt (first 500 chars): %s...", prompt[:500])
+                logger.debug("Full Prompt:\n%s", prompt)
+                if tools:
+                    logger.debug("Tools: %s", _LazyJson(tools))
             
             # Get OpenAI parameters from config with defaults
-            temperature = float(self.config_manager.get('OPENAI_TEMPERATURE', 0.1))
-            max_tokens = int(self.config_manager.get('OPENAI_MAX_TOKENS', 2048))
-            top_p = float(self.config_manager.get('OPENAI_TOP_P', 1))
-            frequency_penalty = float(self.config_manager.get('OPENAI_FREQUENCY_PENALTY', 0))
-            presence_penalty = float(self.config_manager.get('OPENAI_PRESENCE_PENALTY', 0))
+            temperature = float(cfg.get('OPENAI_TEMPERATURE', 0.1))
+            max_tokens = int(cfg.get('OPENAI_MAX_TOKENS', 2048))
+            top_p = float(cfg.get('OPENAI_TOP_P', 1))
+            frequency_penalty = float(cfg.get('OPENAI_FREQUENCY_PENALTY', 0))
+            presence_penalty = float(cfg.get('OPENAI_PRESENCE_PENALTY', 0))
+            
+            self._wait_for_rate_limit(cfg)
             
             # OpenAI's responses API doesn't support function calling/tools
             # Use chat.completions when tools are needed, responses otherwise
@@ -1678,7 +2051,7 @@ class AIProcessor:
                     logger.info(f"OpenAI conversation turn {turn}/{max_turns}")
                     
                     req_start = time.time()
-                    response = self.openai_client.chat.completions.create(
+                    response = client.chat.completions.create(
                         model=model,
                         messages=messages,
                         tools=tools,
@@ -1691,7 +2064,7 @@ class AIProcessor:
                     )
                     req_duration = int((time.time() - req_start) * 1000)
                     
-                    self.last_api_call_time = time.time()
+                    self.last_api_call_time = time.monotonic()
                     message = response.choices[0].message
                     messages.append(message)
                     
@@ -1705,17 +2078,17 @@ class AIProcessor:
                         # Execute each tool call
                         for tool_call in message.tool_calls:
                             function_name = tool_call.function.name
-                            function_args = self._safe_parse_json(tool_call.function.arguments, function_name)
+                            function_args = json_utils.safe_parse_json(tool_call.function.arguments, function_name)
                             if function_args is None:
                                 logger.error(f"Failed to parse {function_name} arguments")
                                 continue
                             
-                            logger.debug(f"Executing function: {function_name} with args: {function_args}")
+                            logger.debug("Executing function: %s with args: %s", function_name, function_args)
                             
                             if on_event:
                                 on_event({"type": "tool_started", "tool": function_name, "args": json.dumps(function_args)})
                             
-                            function_result = self._execute_tmdb_function(function_name, function_args)
+                            function_result = self._execute_tmdb_function(function_name, function_args, cfg)
                             
                             if on_event:
                                 on_event({"type": "tool_completed", "tool": function_name})
@@ -1727,7 +2100,7 @@ class AIProcessor:
                                 "content": json.dumps(function_result)
                             })
                             
-                            logger.debug(f"Function {function_name} returned: {function_result}")
+                            logger.debug("Function %s returned: %s", function_name, function_result)
                         
                         # Continue to next turn to get AI's response with function results
                         continue
@@ -1748,7 +2121,7 @@ class AIProcessor:
             else:
                 # Use responses.create API (no tools needed)
                 req_start = time.time()
-                response = self.openai_client.responses.create(
+                response = client.responses.create(
                     model=model,
                     input=prompt,
                     temperature=temperature,
@@ -1759,7 +2132,7 @@ class AIProcessor:
                 )
                 req_duration = int((time.time() - req_start) * 1000)
                 
-                self.last_api_call_time = time.time()
+                self.last_api_call_time = time.monotonic()
                 logger.info(f"Received successful response from OpenAI Responses API")
                 
                 if on_event:
@@ -1768,12 +2141,9 @@ class AIProcessor:
                 # Extract the text using output_text
                 text = response.output_text
             
-            logger.info("=" * 80)
-            logger.info("OPENAI API RESPONSE")
-            logger.info("=" * 80)
-            logger.info(f"Response length: {len(text)} characters")
-            logger.debug(f"Full Response:\n{text}")
-            logger.info("=" * 80)
+            if logger.isEnabledFor(logging.INFO):
+                _log_banner("OPENAI API RESPONSE", f"Response length: {len(text)} characters")
+                logger.debug("Full Response:\n%s", text)
             
             return self._parse_ai_response(text, "OpenAI", on_event)
                 
@@ -1783,103 +2153,94 @@ class AIProcessor:
                 on_event({"type": "error", "message": str(e)})
             raise
 
-    def _process_batch_openrouter(self, file_paths: List[str], custom_prompt: Optional[str] = None, include_default: bool = True, include_filename: bool = True, enable_web_search: bool = False, enable_tmdb_tool: bool = False, enable_openlibrary_tool: bool = False, enable_comicvine_tool: bool = False, enable_musicbrainz_tool: bool = False, enable_library_tool: bool = False, enable_pending_tool: bool = False, enable_search_queue_tool: bool = False, enable_agent_tools: bool = False, on_event: Optional[Callable] = None) -> List[Dict]:
+    def _process_batch_openrouter(self, req: BatchRequest, on_event: Optional[Callable] = None, cfg: Optional[Mapping] = None, prompt: Optional[str] = None) -> List[Dict]:
         """Process files using OpenRouter (OpenAI-compatible API)."""
-        api_key = self.config_manager.get('OPENROUTER_API_KEY', '')
+        cfg = self.config_manager.snapshot() if cfg is None else cfg
+        api_key = cfg.get('OPENROUTER_API_KEY', '')
         if not api_key:
             logger.error("OPENROUTER_API_KEY not found in configuration")
             raise ValueError("OPENROUTER_API_KEY not set. Please configure it in Settings.")
         
-        if not self.openrouter_client or os.environ.get('OPENROUTER_API_KEY') != api_key:
-            self.openrouter_client = OpenAI(
-                base_url=OPENROUTER_BASE_URL,
-                api_key=api_key
-            )
-            logger.info("Initialized OpenRouter client")
+        client = self.get_openrouter_client(api_key)
         
-        model = self.config_manager.get('AI_MODEL', 'deepseek/deepseek-chat')
+        model = cfg.get('AI_MODEL', 'deepseek/deepseek-chat')
         logger.info(f"Using OpenRouter model: {model}")
-        prompt = self._prepare_batch_prompt(file_paths, custom_prompt, include_default, include_filename)
+        if prompt is None:
+            prompt = self._prepare_batch_prompt(req.file_paths, req.custom_prompt, req.include_default, req.include_filename)
         
         try:
-            delay_seconds = self.config_manager.get('AI_CALL_DELAY_SECONDS', 2)
-            time_since_last_call = time.time() - self.last_api_call_time
-            
-            if time_since_last_call < delay_seconds:
-                wait_time = delay_seconds - time_since_last_call
-                logger.info(f"Rate limit protection: waiting {wait_time:.2f} seconds before API call")
-                time.sleep(wait_time)
-            
             logger.info(f"Sending request to OpenRouter API: {model}")
             
             if on_event:
                 tools_active = []
-                if enable_web_search: tools_active.append("web_search")
-                if enable_tmdb_tool: tools_active.append("tmdb")
-                if enable_openlibrary_tool: tools_active.append("openlibrary")
-                if enable_comicvine_tool: tools_active.append("comicvine")
-                if enable_musicbrainz_tool: tools_active.append("musicbrainz")
-                if enable_library_tool: tools_active.append("library")
-                if enable_pending_tool: tools_active.append("pending")
+                if req.enable_web_search: tools_active.append("web_search")
+                if req.enable_tmdb_tool: tools_active.append("tmdb")
+                if req.enable_openlibrary_tool: tools_active.append("openlibrary")
+                if req.enable_comicvine_tool: tools_active.append("comicvine")
+                if req.enable_musicbrainz_tool: tools_active.append("musicbrainz")
+                if req.enable_library_tool: tools_active.append("library")
+                if req.enable_pending_tool: tools_active.append("pending")
                 on_event({"type": "api_request", "provider": "openrouter", "model": model, "tools": tools_active})
             
             tools = []
             use_tools = False
             
-            if enable_web_search:
+            if req.enable_web_search:
                 logger.warning("Web search is not supported with OpenRouter. Consider enabling TMDB tool for metadata lookup.")
             
-            if enable_tmdb_tool:
-                tmdb_tools = self._get_tmdb_tools_for_openai()
+            if req.enable_tmdb_tool:
+                tmdb_tools = self._get_tmdb_tools_for_openai(cfg)
                 if tmdb_tools:
                     tools.extend(tmdb_tools)
                     use_tools = True
             
-            if enable_openlibrary_tool:
-                ol_tools = self._get_openlibrary_tools_for_openai()
+            if req.enable_openlibrary_tool:
+                ol_tools = self._get_openlibrary_tools_for_openai(cfg)
                 if ol_tools:
                     tools.extend(ol_tools)
                     use_tools = True
             
-            if enable_comicvine_tool:
-                cv_tools = self._get_comicvine_tools_for_openai()
+            if req.enable_comicvine_tool:
+                cv_tools = self._get_comicvine_tools_for_openai(cfg)
                 if cv_tools:
                     tools.extend(cv_tools)
                     use_tools = True
             
-            if enable_musicbrainz_tool:
-                mb_tools = self._get_musicbrainz_tools_for_openai()
+            if req.enable_musicbrainz_tool:
+                mb_tools = self._get_musicbrainz_tools_for_openai(cfg)
                 if mb_tools:
                     tools.extend(mb_tools)
                 use_tools = True
             
-            if enable_library_tool:
+            if req.enable_library_tool:
                 lib_tools = self._get_library_tools_for_openai()
                 if lib_tools:
                     tools.extend(lib_tools)
                     use_tools = True
             
-            if enable_pending_tool:
+            if req.enable_pending_tool:
                 pend_tools = self._get_pending_tools_for_openai()
                 if pend_tools:
                     tools.extend(pend_tools)
                     use_tools = True
             
-            logger.info("=" * 80)
-            logger.info("OPENROUTER API REQUEST")
-            logger.info("=" * 80)
-            logger.info(f"Model: {model}")
-            logger.info(f"Web Search Enabled: {enable_web_search}")
-            logger.info(f"TMDB Tool Enabled: {enable_tmdb_tool}")
-            logger.debug(f"Prompt (first 500 chars): {prompt[:500]}...")
-            logger.debug(f"Full Prompt:\n{prompt}")
-            if tools:
-                logger.debug(f"Tools: {json.dumps(tools, indent=2)}")
-            logger.info("=" * 80)
-            
-            temperature = float(self.config_manager.get('OPENROUTER_TEMPERATURE', 0.1))
-            max_tokens = int(self.config_manager.get('OPENROUTER_MAX_TOKENS', 4096))
-            top_p = float(self.config_manager.get('OPENROUTER_TOP_P', 1))
+            if logger.isEnabledFor(logging.INFO):
+                _log_banner(
+                    "OPENROUTER API REQUEST",
+                    f"Model: {model}",
+                    f"Web Search Enabled: {req.enable_web_search}",
+                    f"TMDB Tool Enabled: {req.enable_tmdb_tool}"
+                )
+                logger.debug("Prompt (first 500 chars): %s...", prompt[:500])
+                logger.debug("Full Prompt:\n%s", prompt)
+                if tools:
+                    logger.debug("Tools: %s", _LazyJson(tools))
+            
+            temperature = float(cfg.get('OPENROUTER_TEMPERATURE', 0.1))
+            max_tokens = int(cfg.get('OPENROUTER_MAX_TOKENS', 4096))
+            top_p = float(cfg.get('OPENROUTER_TOP_P', 1))
+            
+            self._wait_for_rate_limit(cfg)
             
             messages = [{"role": "user", "content": prompt}]
             
@@ -1892,7 +2253,7 @@ class AIProcessor:
                     logger.info(f"OpenRouter conversation turn {turn}/{max_turns}")
                     
                     req_start = time.time()
-                    response = self.openrouter_client.chat.completions.create(
+                    response = client.chat.completions.create(
                         model=model,
                         messages=messages,
                         tools=tools,
@@ -1903,7 +2264,7 @@ class AIProcessor:
                     )
                     req_duration = int((time.time() - req_start) * 1000)
                     
-                    self.last_api_call_time = time.time()
+                    self.last_api_call_time = time.monotonic()
                     message = response.choices[0].message
                     messages.append(message)
                     
@@ -1915,15 +2276,15 @@ class AIProcessor:
                         
                         for tool_call in message.tool_calls:
                             function_name = tool_call.function.name
-                            function_args = self._safe_parse_json(tool_call.function.arguments, function_name)
+                            function_args = json_utils.safe_parse_json(tool_call.function.arguments, function_name)
                             if function_args is None:
                                 logger.error(f"Failed to parse {function_name} arguments")
                                 continue
                             
-                            logger.debug(f"Executing function: {function_name} with args: {function_args}")
+                            logger.debug("Executing function: %s with args: %s", function_name, function_args)
                             if on_event:
                                 on_event({"type": "tool_started", "tool": function_name, "args": json.dumps(function_args)})
-                            function_result = self._execute_tmdb_function(function_name, function_args)
+                            function_result = self._execute_tmdb_function(function_name, function_args, cfg)
                             if on_event:
                                 on_event({"type": "tool_completed", "tool": function_name})
                             
@@ -1933,7 +2294,7 @@ class AIProcessor:
                                 "content": json.dumps(function_result)
                             })
                             
-                            logger.debug(f"Function {function_name} returned: {function_result}")
+                            logger.debug("Function %s returned: %s", function_name, function_result)
                         
                         continue
                     
@@ -1955,7 +2316,7 @@ class AIProcessor:
                     text = "[]"
             else:
                 req_start = time.time()
-                response = self.openrouter_client.chat.completions.create(
+                response = client.chat.completions.create(
                     model=model,
                     messages=messages,
                     temperature=temperature,
@@ -1964,7 +2325,7 @@ class AIProcessor:
                 )
                 req_duration = int((time.time() - req_start) * 1000)
                 
-                self.last_api_call_time = time.time()
+                self.last_api_call_time = time.monotonic()
                 logger.info(f"Received successful response from OpenRouter API")
                 
                 if on_event:
@@ -1981,12 +2342,9 @@ class AIProcessor:
                     logger.warning(f"No content in OpenRouter response. Raw message: {message}")
                     text = ""
             
-            logger.info("=" * 80)
-            logger.info("OPENROUTER API RESPONSE")
-            logger.info("=" * 80)
-            logger.info(f"Response length: {len(text)} characters")
-            logger.debug(f"Full Response:\n{text}")
-            logger.info("=" * 80)
+            if logger.isEnabledFor(logging.INFO):
+                _log_banner("OPENROUTER API RESPONSE", f"Response length: {len(text)} characters")
+                logger.debug("Full Response:\n%s", text)
             
             return self._parse_ai_response(text, "OpenRouter", on_event)
                 
@@ -2014,138 +2372,180 @@ class AIProcessor:
     
     def _get_ollama_models(self) -> List[str]:
         """Fetch available models from Ollama server."""
-        # Cache models for 5 minutes to avoid excessive API calls
-        current_time = time.time()
-        if self.ollama_models_cache and (current_time - self.ollama_models_cache_time) < 300:
+        # Cache models for 5 minutes (connection failures for 1 minute) to avoid excessive API calls
+        base_url = self.config_manager.get('OLLAMA_BASE_URL', 'http://localhost:11434')
+        current_time = time.monotonic()
+        if (self.ollama_models_cache and self.ollama_models_cache_url == base_url
+                and (current_time - self.ollama_models_cache_time) < self.ollama_models_cache_ttl):
             logger.debug("Returning cached Ollama models")
             return self.ollama_models_cache
         
-        base_url = self.config_manager.get('OLLAMA_BASE_URL', 'http://localhost:11434')
-        
         try:
             logger.info(f"Fetching available models from Ollama: {base_url}")
-            response = requests.get(f"{base_url}/api/tags", timeout=5)
+            response = self.http_session.get(base_url + OLLAMA_TAGS_PATH, timeout=2)
             response.raise_for_status()
             
-            data = response.json()
+            data = json_utils.loads(response.content)
             models = [model['name'] for model in data.get('models', [])]
             
             if not models:
                 logger.warning("No models available from Ollama server")
-                return ["No models available"]
+                # Re-check sooner than a real listing, the user is likely pulling a model
+                models = ["No models available"]
+                self.ollama_models_cache = models
+                self.ollama_models_cache_time = current_time
+                self.ollama_models_cache_ttl = OLLAMA_MODELS_ERROR_CACHE_SECONDS
+                self.ollama_models_cache_url = base_url
+                return models
             
             logger.info(f"Found {len(models)} Ollama models: {models}")
             self.ollama_models_cache = models
             self.ollama_models_cache_time = current_time
+            self.ollama_models_cache_ttl = OLLAMA_MODELS_CACHE_SECONDS
+            self.ollama_models_cache_url = base_url
             
             return models
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch Ollama models: {e}")
-            return ["Error: Cannot connect to Ollama server"]
+            # Only log loudly the first time; repeated failures are expected while the server is down
+            if self.ollama_models_cache == [OLLAMA_CONNECT_ERROR] and self.ollama_models_cache_url == base_url:
+                logger.debug("Ollama server still unreachable: %s", e)
+            else:
+                logger.error(f"Failed to fetch Ollama models: {e}")
+            self.ollama_models_cache = [OLLAMA_CONNECT_ERROR]
+            self.ollama_models_cache_time = current_time
+            self.ollama_models_cache_ttl = OLLAMA_MODELS_ERROR_CACHE_SECONDS
+            self.ollama_models_cache_url = base_url
+            return self.ollama_models_cache
         except Exception as e:
             logger.error(f"Unexpected error fetching Ollama models: {e}")
             return ["Error: Failed to fetch models"]
     
-    def _process_batch_ollama(self, file_paths: List[str], custom_prompt: Optional[str] = None, include_default: bool = True, include_filename: bool = True, enable_web_search: bool = False, enable_tmdb_tool: bool = False, enable_openlibrary_tool: bool = False, enable_comicvine_tool: bool = False, enable_musicbrainz_tool: bool = False, enable_library_tool: bool = False, enable_pending_tool: bool = False, enable_search_queue_tool: bool = False, enable_agent_tools: bool = False, on_event: Optional[Callable] = None) -> List[Dict]:
+    @staticmethod
+    def _read_ollama_stream(response: requests.Response) -> Dict:
+        """Consume a streamed /api/generate response and return it as one merged chunk.
+        
+        Each NDJSON line carries a fragment of the 'response' (and, for thinking
+        models, 'thinking') text; the final line has done=true plus the timing stats.
+        """
+        response_parts = []
+        thinking_parts = []
+        data = {}
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json_utils.loads(line)
+                if 'error' in chunk:
+                    raise ValueError(f"Ollama stream error: {chunk['error']}")
+                response_parts.append(chunk.get('response', ''))
+                if chunk.get('thinking'):
+                    thinking_parts.append(chunk['thinking'])
+                data = chunk
+                if chunk.get('done'):
+                    break
+        finally:
+            response.close()
+        
+        data['response'] = ''.join(response_parts)
+        if thinking_parts:
+            data['thinking'] = ''.join(thinking_parts)
+        return data
+
+    def _process_batch_ollama(self, req: BatchRequest, on_event: Optional[Callable] = None, cfg: Optional[Mapping] = None, prompt: Optional[str] = None) -> List[Dict]:
         """Process files using Ollama."""
-        base_url = self.config_manager.get('OLLAMA_BASE_URL', 'http://localhost:11434')
+        cfg = self.config_manager.snapshot() if cfg is None else cfg
+        base_url = cfg.get('OLLAMA_BASE_URL', 'http://localhost:11434')
         if not base_url:
             logger.error("OLLAMA_BASE_URL not found in configuration")
             raise ValueError("OLLAMA_BASE_URL not set. Please configure it in Settings.")
         
-        model = self.config_manager.get('AI_MODEL', 'llama3.2')
+        model = cfg.get('AI_MODEL', 'llama3.2')
         logger.info(f"Using Ollama model: {model}")
-        prompt = self._prepare_batch_prompt(file_paths, custom_prompt, include_default, include_filename)
+        if prompt is None:
+            prompt = self._prepare_batch_prompt(req.file_paths, req.custom_prompt, req.include_default, req.include_filename)
         
-        if enable_web_search:
+        if req.enable_web_search:
             logger.warning("Web search is not supported with Ollama, ignoring this option")
         
         # Build tools for Ollama (same format as OpenAI)
-        if enable_tmdb_tool:
-            tmdb_tools = self._get_tmdb_tools_for_openai()
+        if req.enable_tmdb_tool:
+            tmdb_tools = self._get_tmdb_tools_for_openai(cfg)
         else:
             tmdb_tools = []
         
-        if enable_openlibrary_tool:
-            ol_tools = self._get_openlibrary_tools_for_openai()
-            if not enable_tmdb_tool and not enable_comicvine_tool:
+        if req.enable_openlibrary_tool:
+            ol_tools = self._get_openlibrary_tools_for_openai(cfg)
+            if not req.enable_tmdb_tool and not req.enable_comicvine_tool:
                 tmdb_tools = []
             tmdb_tools.extend(ol_tools)
-        elif not enable_tmdb_tool and not enable_comicvine_tool:
+        elif not req.enable_tmdb_tool and not req.enable_comicvine_tool:
             tmdb_tools = []
         
-        if enable_comicvine_tool:
-            cv_tools = self._get_comicvine_tools_for_openai()
-            if not enable_tmdb_tool and not enable_openlibrary_tool:
+        if req.enable_comicvine_tool:
+            cv_tools = self._get_comicvine_tools_for_openai(cfg)
+            if not req.enable_tmdb_tool and not req.enable_openlibrary_tool:
                 tmdb_tools = []
             tmdb_tools.extend(cv_tools)
         
-        if enable_musicbrainz_tool:
-            mb_tools = self._get_musicbrainz_tools_for_openai()
-            if not enable_tmdb_tool and not enable_openlibrary_tool and not enable_comicvine_tool:
+        if req.enable_musicbrainz_tool:
+            mb_tools = self._get_musicbrainz_tools_for_openai(cfg)
+            if not req.enable_tmdb_tool and not req.enable_openlibrary_tool and not req.enable_comicvine_tool:
                 tmdb_tools = []
             tmdb_tools.extend(mb_tools)
         
-        if enable_library_tool:
+        if req.enable_library_tool:
             lib_tools = self._get_library_tools_for_openai()
-            if not enable_tmdb_tool and not enable_openlibrary_tool and not enable_comicvine_tool and not enable_musicbrainz_tool:
+            if not req.enable_tmdb_tool and not req.enable_openlibrary_tool and not req.enable_comicvine_tool and not req.enable_musicbrainz_tool:
                 tmdb_tools = []
             tmdb_tools.extend(lib_tools)
         
-        if enable_pending_tool:
+        if req.enable_pending_tool:
             pend_tools = self._get_pending_tools_for_openai()
-            if not enable_tmdb_tool and not enable_openlibrary_tool and not enable_comicvine_tool and not enable_musicbrainz_tool and not enable_library_tool:
+            if not req.enable_tmdb_tool and not req.enable_openlibrary_tool and not req.enable_comicvine_tool and not req.enable_musicbrainz_tool and not req.enable_library_tool:
                 tmdb_tools = []
             tmdb_tools.extend(pend_tools)
         
         try:
-            # Enforce delay between API calls
-            delay_seconds = self.config_manager.get('AI_CALL_DELAY_SECONDS', 2)
-            time_since_last_call = time.time() - self.last_api_call_time
-            
-            if time_since_last_call < delay_seconds:
-                wait_time = delay_seconds - time_since_last_call
-                logger.info(f"Rate limit protection: waiting {wait_time:.2f} seconds before API call")
-                time.sleep(wait_time)
-            
             logger.info(f"Sending request to Ollama API: {model}")
             
             if on_event:
                 tools_active = []
-                if enable_tmdb_tool: tools_active.append("tmdb")
-                if enable_openlibrary_tool: tools_active.append("openlibrary")
-                if enable_comicvine_tool: tools_active.append("comicvine")
-                if enable_musicbrainz_tool: tools_active.append("musicbrainz")
-                if enable_library_tool: tools_active.append("library")
-                if enable_pending_tool: tools_active.append("pending")
+                if req.enable_tmdb_tool: tools_active.append("tmdb")
+                if req.enable_openlibrary_tool: tools_active.append("openlibrary")
+                if req.enable_comicvine_tool: tools_active.append("comicvine")
+                if req.enable_musicbrainz_tool: tools_active.append("musicbrainz")
+                if req.enable_library_tool: tools_active.append("library")
+                if req.enable_pending_tool: tools_active.append("pending")
                 on_event({"type": "api_request", "provider": "ollama", "model": model, "tools": tools_active})
             
             # Log full request
-            logger.info("=" * 80)
-            logger.info("OLLAMA API REQUEST")
-            logger.info("=" * 80)
-            logger.info(f"Base URL: {base_url}")
-            logger.info(f"Model: {model}")
-            logger.info(f"TMDB Tool Enabled: {len(tmdb_tools) > 0}")
-            logger.debug(f"Prompt (first 500 chars): {prompt[:500]}...")
-            logger.debug(f"Full Prompt:\n{prompt}")
-            if tmdb_tools:
-                logger.debug(f"Tools: {json.dumps(tmdb_tools, indent=2)}")
-            logger.info("=" * 80)
+            if logger.isEnabledFor(logging.INFO):
+                _log_banner(
+                    "OLLAMA API REQUEST",
+                    f"Base URL: {base_url}",
+                    f"Model: {model}",
+                    f"TMDB Tool Enabled: {len(tmdb_tools) > 0}"
+                )
+                logger.debug("Prompt (first 500 chars): %s...", prompt[:500])
+                logger.debug("Full Prompt:\n%s", prompt)
+                if tmdb_tools:
+                    logger.debug("Tools: %s", _LazyJson(tmdb_tools))
             
             # Use Ollama's generate endpoint with configurable parameters
-            url = f"{base_url}/api/generate"
+            url = base_url + OLLAMA_GENERATE_PATH
             
             # Get Ollama parameters from config (with defaults) and ensure they're proper numeric types
-            temperature = float(self.config_manager.get('OLLAMA_TEMPERATURE', 0.1))
-            num_predict = int(self.config_manager.get('OLLAMA_NUM_PREDICT', 2048))
-            top_k = int(self.config_manager.get('OLLAMA_TOP_K', 40))
-            top_p = float(self.config_manager.get('OLLAMA_TOP_P', 0.9))
+            temperature = float(cfg.get('OLLAMA_TEMPERATURE', 0.1))
+            num_predict = int(cfg.get('OLLAMA_NUM_PREDICT', 2048))
+            top_k = int(cfg.get('OLLAMA_TOP_K', 40))
+            top_p = float(cfg.get('OLLAMA_TOP_P', 0.9))
             
             payload = {
                 "model": model,
                 "prompt": prompt,
-                "stream": False,
+                # Stream plain generations; tool-calling responses are only usable once complete
+                "stream": not tmdb_tools,
+                "keep_alive": ollama_keep_alive(cfg),
                 "options": {
                     "temperature": temperature,
                     "num_predict": num_predict,
@@ -2160,18 +2560,20 @@ class AIProcessor:
             
             logger.info(f"Ollama options: temperature={temperature}, num_predict={num_predict}, top_k={top_k}, top_p={top_p}")
             
+            self._wait_for_rate_limit(cfg)
+            
             req_start = time.time()
-            response = requests.post(url, json=payload, timeout=120)
+            response = self.post_with_retry(url, payload, "Ollama", timeout=120, on_event=on_event, stream=payload["stream"])
             req_duration = int((time.time() - req_start) * 1000)
-            self.last_api_call_time = time.time()
+            self.last_api_call_time = time.monotonic()
             
             # Log response before raising error
             if response.status_code != 200:
                 logger.error(f"Ollama API returned status code: {response.status_code}")
                 logger.error(f"Response body: {response.text}")
                 try:
-                    error_data = response.json()
-                    logger.error(f"Error details: {json.dumps(error_data, indent=2)}")
+                    error_data = json_utils.loads(response.content)
+                    logger.error("Error details: %s", _LazyJson(error_data))
                 except:
                     pass
             
@@ -2179,11 +2581,16 @@ class AIProcessor:
             
             logger.info(f"Received successful response from Ollama API (status: {response.status_code})")
             
+            if payload["stream"]:
+                data = self._read_ollama_stream(response)
+                req_duration = int((time.time() - req_start) * 1000)
+                self.last_api_call_time = time.monotonic()
+            else:
+                data = json_utils.loads(response.content)
+            
             if on_event:
                 on_event({"type": "api_response", "turn": 1, "duration_ms": req_duration})
             
-            data = response.json()
-            
             # Handle thinking models - check if there's a thinking field
             # For models like deepseek-r1, the response structure includes thinking and content separately
             if 'message' in data and isinstance(data['message'], dict):
@@ -2201,14 +2608,14 @@ class AIProcessor:
                 text = data.get('response', '')
             
             # Log full response
-            logger.info("=" * 80)
-            logger.info("OLLAMA API RESPONSE")
-            logger.info("=" * 80)
-            logger.info(f"Status Code: {response.status_code}")
-            logger.debug(f"Full Response:\n{json.dumps(data, indent=2)}")
-            if 'message' in data and 'thinking' in data.get('message', {}):
-                logger.info(f"Thinking detected (length: {len(data['message']['thinking'])} chars)")
-            logger.info("=" * 80)
+            if logger.isEnabledFor(logging.INFO):
+                lines = [f"Status Code: {response.status_code}"]
+                if 'message' in data and 'thinking' in data.get('message', {}):
+                    lines.append(f"Thinking detected (length: {len(data['message']['thinking'])} chars)")
+                elif data.get('thinking'):
+                    lines.append(f"Thinking detected (length: {len(data['thinking'])} chars)")
+                _log_banner("OLLAMA API RESPONSE", *lines)
+                logger.debug("Full Response:\n%s", _LazyJson(data))
             
             return self._parse_ai_response(text, "Ollama", on_event)
                 
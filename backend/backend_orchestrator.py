@@ -1,22 +1,34 @@
+import errno
+import heapq
 import os
+import random
 import shutil
+import sys
 import threading
 import time
 import logging
 import re
 import requests
 import uuid
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows; reflink cloning is Linux-only anyway
+    fcntl = None
 
 from backend.job_store import JobStore, JobStatus, TV_EPISODE_PATTERN
 from backend.config_manager import ConfigManager
-from backend.ai_processor import AIProcessor
+from backend.ai_processor import AIProcessor, CACHE_INVALIDATING_CONFIG_KEYS
 from backend.library_browser import LibraryBrowser
 from backend.file_watcher import (
     FileWatcher, 
     DownloadingFolderHandler,
-    CompletedFolderHandler
+    CompletedFolderHandler,
+    is_ignored_file,
+    MIN_POLL_INTERVAL_SECONDS
 )
 from backend.file_movement_logger import FileMovementLogger
 from backend.ai_sse_broker import AISSEBroker
@@ -24,6 +36,26 @@ from backend.smart_agent import SmartAgent
 
 logger = logging.getLogger(__name__)
 
+# How long an idle queue worker sleeps before re-checking on its own. New work wakes it
+# immediately; this only paces the time-based checks (patience windows, failed-job
+# retries and missing-file cleanup).
+QUEUE_IDLE_POLL_SECONDS = 5
+# Minimum gap between missing-file sweeps, so a burst of wakeups does not stat every job each time
+MISSING_FILE_CHECK_SECONDS = 5
+# Bounds for the queue worker's backoff after an unexpected error; doubles per consecutive failure
+QUEUE_ERROR_BACKOFF_MIN_SECONDS = 1
+QUEUE_ERROR_BACKOFF_MAX_SECONDS = 30
+# How long a completed job stays in the store so the UI can show its completion
+COMPLETED_JOB_DISPLAY_SECONDS = 1
+# Jellyfin refreshes requested within this window of the first one are sent as a single request
+JELLYFIN_REFRESH_DEBOUNCE_SECONDS = 2
+# Number of locks destinations are hashed onto when serialising moves to the same path
+MOVE_LOCK_STRIPES = 16
+# Linux ioctl that makes the destination share the source's data blocks (Btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+# Config keys the orchestrator reacts to on reload; any other change needs no action here
+WATCHED_CONFIG_KEYS = ('DOWNLOADING_PATH', 'COMPLETED_PATH', 'WATCH_MODE', 'POLL_INTERVAL_SECONDS')
+
 
 class BackendOrchestrator:
     def __init__(self, config_manager: ConfigManager, job_store: JobStore):
@@ -40,6 +72,30 @@ class BackendOrchestrator:
         
         self.queue_thread: Optional[threading.Thread] = None
         self.queue_running = False
+        # Signalled whenever work is queued so the worker does not wait out its idle poll
+        self._queue_cv = threading.Condition()
+        self._queue_wake = False
+        self._last_missing_check = 0.0  # time.monotonic() of the last missing-file sweep
+        # Organises files that land in the completed folder off the watchdog thread
+        self._fs_pool: Optional[ThreadPoolExecutor] = None
+        self._move_locks = [threading.Lock() for _ in range(MOVE_LOCK_STRIPES)]
+        self._organizing = set()  # job_ids queued on or running in _fs_pool
+        self._organizing_lock = threading.Lock()
+        
+        # Runs single/grouped AI jobs so up to AI_CONCURRENCY of them are in flight at once
+        self._ai_pool: Optional[ThreadPoolExecutor] = None
+        self._ai_in_flight = 0  # guarded by _queue_cv
+        
+        # (due monotonic time, job_id) of completed jobs waiting to be removed, drained by one thread
+        self._removal_heap: List[Tuple[float, str]] = []
+        self._removal_cv = threading.Condition()
+        self._removal_thread: Optional[threading.Thread] = None
+        
+        # Monotonic time the next coalesced Jellyfin refresh is due, sent by one thread over a kept-alive session
+        self._jellyfin_due: Optional[float] = None
+        self._jellyfin_cv = threading.Condition()
+        self._jellyfin_thread: Optional[threading.Thread] = None
+        self._jellyfin_session = requests.Session()
         
         self._running = False
         self._last_processing_time = time.time()  # Track last time we processed something
@@ -67,15 +123,21 @@ class BackendOrchestrator:
             logger.info(f"Restored {loaded} pending job(s) from disk, skipping re-scan for those files")
         
         downloading_handler = DownloadingFolderHandler(self._on_file_detected, downloading_path)
-        self.downloading_watcher = FileWatcher(downloading_path, downloading_handler)
+        watch_mode = self.config_manager.get('WATCH_MODE', 'auto')
+        poll_interval = max(MIN_POLL_INTERVAL_SECONDS, float(self.config_manager.get('POLL_INTERVAL_SECONDS', 5)))
+        self.downloading_watcher = FileWatcher(downloading_path, downloading_handler, watch_mode, poll_interval)
         self.downloading_watcher.start()
         logger.debug("Downloading folder watcher started")
         
         completed_handler = CompletedFolderHandler(self._on_file_in_completed, completed_path)
-        self.completed_watcher = FileWatcher(completed_path, completed_handler)
+        self.completed_watcher = FileWatcher(completed_path, completed_handler, watch_mode, poll_interval)
         self.completed_watcher.start()
         logger.debug("Completed folder watcher started")
         
+        self._fs_pool = ThreadPoolExecutor(max_workers=max(1, int(self.config_manager.get('FS_WORKERS', 4))),
+                                           thread_name_prefix="organize")
+        self._ai_pool = ThreadPoolExecutor(max_workers=max(1, int(self.config_manager.get('AI_CONCURRENCY', 4))),
+                                           thread_name_prefix="ai-job")
         self.queue_running = True
         self.queue_thread = threading.Thread(target=self._queue_worker, daemon=True)
         self.queue_thread.start()
@@ -95,6 +157,7 @@ class BackendOrchestrator:
         
         self._running = False
         self.queue_running = False
+        self.wake_queue()
         
         if self.downloading_watcher:
             self.downloading_watcher.stop()
@@ -108,11 +171,21 @@ class BackendOrchestrator:
             self.queue_thread.join(timeout=5)
             logger.debug("Queue worker thread stopped")
         
+        if self._fs_pool:
+            # Wait for queued moves so no file is left half-organised
+            self._fs_pool.shutdown(wait=True)
+            self._fs_pool = None
+        
+        if self._ai_pool:
+            # Let in-flight AI calls finish in the background rather than block shutdown on them
+            self._ai_pool.shutdown(wait=False)
+            self._ai_pool = None
+        
         logger.info("Backend orchestrator stopped successfully")
 
     def _on_file_detected(self, file_path: str, relative_path: str):
         logger.info(f"File detected in downloading folder: {relative_path}")
-        logger.debug(f"Full path: {file_path}")
+        logger.debug("Full path: %s", file_path)
         
         existing_job = self.job_store.get_job_by_path(file_path)
         if existing_job:
@@ -121,17 +194,7 @@ class BackendOrchestrator:
         
         # Check if there's an existing job with the same base name AND in the same directory (for grouping)
         # This ensures files in different subdirectories are not grouped together
-        file_dir = os.path.dirname(relative_path)
-        base_name = os.path.splitext(os.path.basename(relative_path))[0]
-        
-        # Find existing job with same base name in the same directory
-        existing_group_job = None
-        for job in self.job_store.get_all_jobs():
-            job_dir = os.path.dirname(job.relative_path)
-            job_base_name = os.path.splitext(os.path.basename(job.relative_path))[0]
-            if job_base_name == base_name and job_dir == file_dir:
-                existing_group_job = job
-                break
+        existing_group_job = self.job_store.find_sibling_job(relative_path)
         
         job = self.job_store.add_job(file_path, relative_path)
         # Apply default web search and TMDB tool settings from config
@@ -158,6 +221,7 @@ class BackendOrchestrator:
             logger.info(f"Created job {job.job_id} for {relative_path} - added to queue (web_search={job.enable_web_search}, tmdb_tool={job.enable_tmdb_tool})")
         
         # Job is now in queue and will be processed by queue worker
+        self.wake_queue()
 
     def _scan_existing_files(self):
         """
@@ -172,6 +236,8 @@ class BackendOrchestrator:
             for root, dirs, files in os.walk(downloading_path):
                 for file in files:
                     file_path = os.path.join(root, file)
+                    if is_ignored_file(file_path):
+                        continue
                     relative_path = os.path.relpath(file_path, downloading_path)
                     self._on_file_detected(file_path, relative_path)
                     downloading_count += 1
@@ -192,6 +258,8 @@ class BackendOrchestrator:
             for root, dirs, files in os.walk(completed_path):
                 for file in files:
                     file_path = os.path.join(root, file)
+                    if is_ignored_file(file_path):
+                        continue
                     relative_path = os.path.relpath(file_path, completed_path)
                     self._on_file_in_completed(file_path, relative_path)
                     completed_count += 1
@@ -408,46 +476,99 @@ class BackendOrchestrator:
         if age >= patience_seconds:
             return True
         
-        logger.debug(f"Batch has {len(batch)} files, waiting for more (oldest: {age:.1f}s ago, patience: {patience_seconds}s)")
+        logger.debug("Batch has %s files, waiting for more (oldest: %.1fs ago, patience: %ss)", len(batch), age, patience_seconds)
         return False
     
+    def wake_queue(self):
+        """Wake the queue worker so newly queued work is picked up without waiting for the idle poll."""
+        with self._queue_cv:
+            self._queue_wake = True
+            self._queue_cv.notify()
+    
+    def _wait_for_work(self, timeout: float):
+        """Block until wake_queue() is called, the worker is stopped, or timeout seconds pass."""
+        with self._queue_cv:
+            self._queue_cv.wait_for(lambda: self._queue_wake or not self.queue_running, timeout=timeout)
+            self._queue_wake = False
+    
     def _queue_worker(self):
         """Process jobs from the queue using smart agent batching when enabled."""
         logger.info("Queue worker started")
+        error_backoff = 0
         
         while self.queue_running:
+            last_processing_time = self._last_processing_time
             try:
-                self._check_and_remove_missing_files()
+                now = time.monotonic()
+                if now - self._last_missing_check >= MISSING_FILE_CHECK_SECONDS:
+                    self._last_missing_check = now
+                    self._check_and_remove_missing_files()
                 
                 if self._check_stalled_queue():
                     logger.info("Queue was stalled, resuming processing")
                 
-                # First check for priority jobs (re-AI requests)
-                priority_jobs = self.job_store.get_priority_jobs()
+                # Priority jobs (re-AI requests) sort ahead of everything else queued
+                next_job = self.job_store.next_queued_job()
                 
-                if priority_jobs:
-                    job = priority_jobs[0]
-                    logger.info(f"Processing priority job: {job.job_id} ({job.relative_path})")
-                    self._process_single_job(job, is_priority=True)
-                    self._last_processing_time = time.time()
+                if next_job and next_job.priority:
+                    if self._has_ai_capacity():
+                        job = next_job
+                        logger.info(f"Processing priority job: {job.job_id} ({job.relative_path})")
+                        self._submit_ai_work([job], self._process_single_job, job, is_priority=True)
                 else:
                     use_smart_agent = self.config_manager.get('ENABLE_SMART_AGENT', True)
                     
                     if use_smart_agent:
                         self._process_queue_with_agent()
                     else:
-                        self._process_queue_legacy()
+                        self._process_queue_legacy(next_job)
+                error_backoff = 0
                 
-                time.sleep(1)
+                # Something was processed, so more may be ready; otherwise sleep until woken
+                if self._last_processing_time == last_processing_time:
+                    self._wait_for_work(QUEUE_IDLE_POLL_SECONDS)
             
             except Exception as e:
-                logger.error(f"Error in queue worker: {type(e).__name__}: {e}", exc_info=True)
-                time.sleep(1)
+                # Back off on repeated failures (with jitter), but still wake early for new work
+                error_backoff = min(max(error_backoff * 2, QUEUE_ERROR_BACKOFF_MIN_SECONDS), QUEUE_ERROR_BACKOFF_MAX_SECONDS)
+                delay = random.uniform(error_backoff / 2, error_backoff)
+                logger.error(f"Error in queue worker: {type(e).__name__}: {e} (retrying in {delay:.1f}s)", exc_info=True)
+                self._wait_for_work(delay)
 
+    def _has_ai_capacity(self) -> bool:
+        """True while fewer than AI_CONCURRENCY single/grouped AI jobs are in flight."""
+        with self._queue_cv:
+            return self._ai_in_flight < max(1, int(self.config_manager.get('AI_CONCURRENCY', 4)))
+    
+    def _submit_ai_work(self, jobs: List, fn, *args, **kwargs):
+        """Mark jobs PROCESSING_AI and run fn(*args, **kwargs) on the AI pool.
+        
+        The status change happens here, before the worker looks at the queue again,
+        so the same jobs cannot be picked up twice.
+        """
+        self.job_store.update_jobs_bulk([(job.job_id, JobStatus.PROCESSING_AI, {}) for job in jobs])
+        self._last_processing_time = time.time()
+        
+        if self._ai_pool is None:
+            fn(*args, **kwargs)
+            return
+        
+        with self._queue_cv:
+            self._ai_in_flight += 1
+        self._ai_pool.submit(fn, *args, **kwargs).add_done_callback(self._on_ai_work_done)
+    
+    def _on_ai_work_done(self, future):
+        exc = future.exception()
+        if exc is not None:
+            logger.error(f"AI job failed: {type(exc).__name__}: {exc}")
+        with self._queue_cv:
+            self._ai_in_flight -= 1
+            self._queue_wake = True
+            self._queue_cv.notify()
+    
     def _process_queue_with_agent(self):
         """Process queued jobs using the Smart Agent with intelligent pre-grouping."""
-        queued_jobs = self.job_store.get_jobs_by_status(JobStatus.QUEUED_FOR_AI)
-        non_priority = [j for j in queued_jobs if not j.priority]
+        non_priority = self.job_store.get_jobs_by_status(JobStatus.QUEUED_FOR_AI, priority=False)
         
         if not non_priority:
             self._retry_failed_jobs()
@@ -496,47 +617,44 @@ class BackendOrchestrator:
         
         return result
 
-    def _process_queue_legacy(self):
-        """Original single-job-at-a-time processing for backward compatibility."""
-        queued_jobs = self.job_store.get_jobs_by_status(JobStatus.QUEUED_FOR_AI)
-        non_priority_jobs = [j for j in queued_jobs if not j.priority]
+    def _process_queue_legacy(self, job=None):
+        """Original per-job processing for backward compatibility, now up to AI_CONCURRENCY jobs at once.
         
-        if non_priority_jobs:
-            job = non_priority_jobs[0]
-            
+        job is the oldest non-priority queued job, as returned by JobStore.next_queued_job.
+        """
+        if not self._has_ai_capacity():
+            return
+        
+        if job:
             if job.group_id and job.is_group_primary:
                 group_jobs = self.job_store.get_jobs_by_group(job.group_id)
                 group_queued = [j for j in group_jobs if j.status == JobStatus.QUEUED_FOR_AI]
                 
                 if len(group_queued) == len(group_jobs):
                     logger.info(f"Processing grouped jobs: {len(group_jobs)} files with same base name")
-                    self._process_grouped_jobs(group_jobs, is_priority=False)
-                    self._last_processing_time = time.time()
+                    self._submit_ai_work(group_jobs, self._process_grouped_jobs, group_jobs, is_priority=False)
                 else:
-                    logger.debug(f"Waiting for all files in group {job.group_id} to be ready ({len(group_queued)}/{len(group_jobs)})")
+                    logger.debug("Waiting for all files in group %s to be ready (%s/%s)", job.group_id, len(group_queued), len(group_jobs))
             elif job.is_group_primary or not job.group_id:
                 logger.info(f"Processing queued job: {job.job_id} ({job.relative_path})")
-                self._process_single_job(job, is_priority=False)
-                self._last_processing_time = time.time()
+                self._submit_ai_work([job], self._process_single_job, job, is_priority=False)
             else:
-                logger.debug(f"Skipping secondary file {job.job_id}, waiting for primary file in group")
+                logger.debug("Skipping secondary file %s, waiting for primary file in group", job.job_id)
         else:
             self._retry_failed_jobs()
 
     def _retry_failed_jobs(self):
         """Retry failed jobs after all queued jobs are processed."""
+        if not self._has_ai_capacity():
+            return
         failed_jobs = self.job_store.get_failed_jobs_for_retry()
         if failed_jobs:
             job = failed_jobs[0]
             logger.info(f"Retrying failed job: {job.job_id} ({job.relative_path}) - Attempt {job.retry_count + 1}/{job.max_retries}")
-            self._process_single_job(job, is_priority=False, is_retry=True)
-            self._last_processing_time = time.time()
+            self._submit_ai_work([job], self._process_single_job, job, is_priority=False, is_retry=True)
     
-    def _process_grouped_jobs(self, jobs: List, is_priority: bool = False):
-        """Process a group of jobs with the same base name together through AI."""
-        for job in jobs:
-            self.job_store.update_job(job.job_id, JobStatus.PROCESSING_AI)
-        
+    def _process_grouped_jobs(self, jobs: List, is_priority: bool = False, is_retry: bool = False):
+        """Process a group of jobs with the same base name together through AI. _submit_ai_work has already marked them PROCESSING_AI."""
         primary_job = next((j for j in jobs if j.is_group_primary), jobs[0])
         self.ai_sse_broker.publish({"type": "job_started", "job_id": primary_job.job_id, "file": f"{len(jobs)} files grouped"})
         self.ai_sse_broker.publish({"type": "thinking", "message": "Analyzing filenames..."})
@@ -568,6 +686,7 @@ class BackendOrchestrator:
                 enable_musicbrainz_tool=enable_musicbrainz_tool,
                 enable_library_tool=enable_library_tool,
                 enable_pending_tool=enable_pending_tool,
+                use_cache=not (is_priority or is_retry),
                 on_event=self.ai_sse_broker.publish
             )
             
@@ -588,6 +707,7 @@ class BackendOrchestrator:
                     primary_dir = ''
                 
                 # Apply results to each job, ensuring they use the same directory
+                updates = []
                 for job, result in zip(jobs, results):
                     suggested_name = result.get('suggested_name')
                     confidence = result.get('confidence', 0)
@@ -605,45 +725,41 @@ class BackendOrchestrator:
                         else:
                             suggested_name = filename
                     
-                    self.job_store.update_job(
-                        job.job_id,
-                        JobStatus.PENDING_COMPLETION,
-                        suggested_name=suggested_name,
-                        confidence=confidence,
-                        priority=False if is_priority else job.priority
-                    )
+                    updates.append((job.job_id, JobStatus.PENDING_COMPLETION, {
+                        'suggested_name': suggested_name,
+                        'confidence': confidence,
+                        'priority': False if is_priority else job.priority
+                    }))
                     logger.info(f"Job {job.job_id} completed: {job.relative_path} -> {suggested_name} (confidence: {confidence}%)")
+                self.job_store.update_jobs_bulk(updates)
                 
                 logger.info(f"All grouped files will remain in downloading folder until moved to completed folder for organization")
                 
                 self.ai_sse_broker.publish({"type": "job_done", "job_id": primary_job.job_id, "status": "pending_completion", "confidence": primary_result.get('confidence', 0), "name": f"{len(jobs)} files processed"})
             else:
                 logger.warning(f"AI results mismatch for grouped jobs: expected {len(jobs)}, got {len(results) if results else 0}")
-                for job in jobs:
-                    self.job_store.update_job(
-                        job.job_id,
-                        JobStatus.FAILED,
-                        error_message="AI result mismatch for grouped files",
-                        priority=False if is_priority else job.priority
-                    )
+                self.job_store.update_jobs_bulk([
+                    (job.job_id, JobStatus.FAILED, {
+                        'error_message': "AI result mismatch for grouped files",
+                        'priority': False if is_priority else job.priority
+                    })
+                    for job in jobs
+                ])
                 self.ai_sse_broker.publish({"type": "job_error", "job_id": primary_job.job_id, "error": "AI result mismatch for grouped files"})
         
         except Exception as e:
             logger.error(f"Error processing grouped jobs: {type(e).__name__}: {e}", exc_info=True)
-            for job in jobs:
-                self.job_store.update_job(
-                    job.job_id,
-                    JobStatus.FAILED,
-                    error_message=str(e),
-                    priority=False if is_priority else job.priority
-                )
+            self.job_store.update_jobs_bulk([
+                (job.job_id, JobStatus.FAILED, {
+                    'error_message': str(e),
+                    'priority': False if is_priority else job.priority
+                })
+                for job in jobs
+            ])
             self.ai_sse_broker.publish({"type": "job_error", "job_id": primary_job.job_id, "error": str(e)[:200]})
     
     def _process_single_job(self, job, is_priority: bool = False, is_retry: bool = False):
-        """Process a single job through AI."""
-        self.job_store.update_job(job.job_id, JobStatus.PROCESSING_AI)
-        logger.debug(f"Updated job {job.job_id} to PROCESSING_AI status")
-        
+        """Process a single job through AI. _submit_ai_work has already marked it PROCESSING_AI."""
         self.ai_sse_broker.publish({"type": "job_started", "job_id": job.job_id, "file": job.relative_path})
         self.ai_sse_broker.publish({"type": "thinking", "message": "Analyzing filename..."})
         
@@ -659,7 +775,7 @@ class BackendOrchestrator:
             enable_library_tool = getattr(job, 'enable_library_tool', self.config_manager.get('ENABLE_LIBRARY_TOOL', False)) if hasattr(job, 'enable_library_tool') else self.config_manager.get('ENABLE_LIBRARY_TOOL', False)
             enable_pending_tool = getattr(job, 'enable_pending_tool', self.config_manager.get('ENABLE_PENDING_TOOL', False)) if hasattr(job, 'enable_pending_tool') else self.config_manager.get('ENABLE_PENDING_TOOL', False)
             
-            logger.debug(f"Job {job.job_id} settings: custom_prompt={bool(custom_prompt)}, include_instructions={include_instructions}, include_filename={include_filename}, web_search={enable_web_search}, tmdb_tool={enable_tmdb_tool}, openlibrary_tool={enable_openlibrary_tool}, comicvine_tool={enable_comicvine_tool}, library_tool={enable_library_tool}, pending_tool={enable_pending_tool}")
+            logger.debug("Job %s settings: custom_prompt=%s, include_instructions=%s, include_filename=%s, web_search=%s, tmdb_tool=%s, openlibrary_tool=%s, comicvine_tool=%s, library_tool=%s, pending_tool=%s", job.job_id, bool(custom_prompt), include_instructions, include_filename, enable_web_search, enable_tmdb_tool, enable_openlibrary_tool, enable_comicvine_tool, enable_library_tool, enable_pending_tool)
             
             result = self.ai_processor.process_single(
                 job.relative_path,
@@ -673,6 +789,7 @@ class BackendOrchestrator:
                 enable_musicbrainz_tool=enable_musicbrainz_tool,
                 enable_library_tool=enable_library_tool,
                 enable_pending_tool=enable_pending_tool,
+                use_cache=not (is_priority or is_retry),
                 on_event=self.ai_sse_broker.publish
             )
             
@@ -730,49 +847,52 @@ class BackendOrchestrator:
         library_path = self.config_manager.get('LIBRARY_PATH')
         
         logger.info(f"Organizing file for job {job.job_id}: {file_path}")
-        logger.debug(f"Library path: {library_path}")
+        logger.debug("Library path: %s", library_path)
         
         new_name = job.suggested_name or os.path.basename(file_path)
-        logger.debug(f"Target name: {new_name}")
+        logger.debug("Target name: %s", new_name)
         
         if job.new_path:
             destination_dir = os.path.join(library_path, os.path.dirname(job.new_path))
             destination_file = os.path.join(library_path, job.new_path)
-            logger.debug(f"Using custom path: {job.new_path}")
+            logger.debug("Using custom path: %s", job.new_path)
         else:
             destination_file = os.path.join(library_path, new_name)
             destination_dir = os.path.dirname(destination_file)
             if not destination_dir or destination_dir == library_path:
                 destination_dir = library_path
         
-        logger.debug(f"Destination directory: {destination_dir}")
-        logger.debug(f"Destination file: {destination_file}")
+        logger.debug("Destination directory: %s", destination_dir)
+        logger.debug("Destination file: %s", destination_file)
         
         try:
             os.makedirs(destination_dir, exist_ok=True)
-            logger.debug(f"Created/verified destination directory: {destination_dir}")
+            logger.debug("Created/verified destination directory: %s", destination_dir)
             
-            # Check if destination file already exists
-            if os.path.exists(destination_file):
-                relative_dest_path = os.path.relpath(destination_file, library_path)
-                is_other_folder = relative_dest_path.startswith('Other' + os.sep) or relative_dest_path.startswith('Other/')
+            # Held from the existence check through the move so two jobs that resolve to the
+            # same destination (organised in parallel) cannot both see it as free
+            with self._move_lock_for(destination_file):
+                # Check if destination file already exists
+                if os.path.exists(destination_file):
+                    relative_dest_path = os.path.relpath(destination_file, library_path)
+                    is_other_folder = relative_dest_path.startswith('Other' + os.sep) or relative_dest_path.startswith('Other/')
+                    
+                    if job.force_overwrite:
+                        logger.warning(f"Force overwrite enabled, removing existing file: {destination_file}")
+                        os.remove(destination_file)
+                    elif is_other_folder:
+                        logger.warning(f"Destination file exists in Other folder, will overwrite: {destination_file}")
+                        os.remove(destination_file)
+                    else:
+                        logger.warning(f"Destination file already exists: {destination_file}. Marking job as duplicate.")
+                        self.job_store.update_job(
+                            job.job_id,
+                            JobStatus.PENDING_COMPLETION,
+                            destination_exists=True
+                        )
+                        return
                 
-                if job.force_overwrite:
-                    logger.warning(f"Force overwrite enabled, removing existing file: {destination_file}")
-                    os.remove(destination_file)
-                elif is_other_folder:
-                    logger.warning(f"Destination file exists in Other folder, will overwrite: {destination_file}")
-                    os.remove(destination_file)
-                else:
-                    logger.warning(f"Destination file already exists: {destination_file}. Marking job as duplicate.")
-                    self.job_store.update_job(
-                        job.job_id,
-                        JobStatus.PENDING_COMPLETION,
-                        destination_exists=True
-                    )
-                    return
-            
-            shutil.move(file_path, destination_file)
+                self._move_file(file_path, destination_file)
             logger.info(f"Successfully moved file: {file_path} -> {destination_file}")
             # Log the successful movement
             self.file_movement_logger.log_movement(
@@ -792,25 +912,16 @@ class BackendOrchestrator:
             # Trigger Jellyfin refresh if enabled
             self._trigger_jellyfin_refresh()
             
-            # Clean up empty directories in downloading folder
+            # Clean up the folders this file left empty in the downloading and completed folders
             downloading_path = self.config_manager.get('DOWNLOADING_PATH')
-            self._cleanup_empty_directories(downloading_path)
+            self._prune_empty_parents(os.path.join(downloading_path, os.path.dirname(job.relative_path)), downloading_path)
             
-            # Clean up empty directories in completed folder (including subdirectories)
             completed_path = self.config_manager.get('COMPLETED_PATH')
-            self._cleanup_empty_directories(completed_path)
+            self._prune_empty_parents(os.path.dirname(file_path), completed_path)
             
-            # Auto-remove completed job from store after 1 second
+            # Auto-remove completed job from store after a short delay
             # This gives the UI time to display completion status before removal
-            def remove_completed_job():
-                time.sleep(1)
-                if self.job_store.delete_job(job.job_id):
-                    logger.info(f"Job {job.job_id} automatically removed from store after completion")
-                else:
-                    logger.warning(f"Failed to auto-remove completed job {job.job_id}")
-            
-            removal_thread = threading.Thread(target=remove_completed_job, daemon=True)
-            removal_thread.start()
+            self._schedule_job_removal(job.job_id)
         
         except Exception as e:
             logger.error(f"Error organizing file for job {job.job_id}: {type(e).__name__}: {e}", exc_info=True)
@@ -828,25 +939,85 @@ class BackendOrchestrator:
                 error_message=str(e)
             )
 
+    def _move_lock_for(self, destination: str) -> threading.Lock:
+        return self._move_locks[hash(os.path.normcase(destination)) % MOVE_LOCK_STRIPES]
+    
+    @staticmethod
+    def _move_file(source: str, destination: str):
+        """Move a file with a single rename, copying only when it has to cross filesystems."""
+        try:
+            os.replace(source, destination)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # Separate mounts of one filesystem (e.g. two bind mounts of the same Btrfs/XFS
+            # volume) refuse rename but can still clone, which avoids copying the data
+            if BackendOrchestrator._clone_file(source, destination):
+                os.remove(source)
+            else:
+                shutil.move(source, destination)
+    
+    @staticmethod
+    def _clone_file(source: str, destination: str) -> bool:
+        """Reflink source to destination with FICLONE. Returns False (leaving no destination) if unsupported."""
+        if fcntl is None or not sys.platform.startswith('linux'):
+            return False
+        try:
+            with open(source, 'rb') as src, open(destination, 'xb') as dst:
+                try:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                except OSError:
+                    dst.close()
+                    os.remove(destination)
+                    return False
+        except OSError:
+            return False
+        shutil.copystat(source, destination)
+        return True
+    
+    def _schedule_job_removal(self, job_id: str):
+        """Remove a job from the store COMPLETED_JOB_DISPLAY_SECONDS from now."""
+        with self._removal_cv:
+            heapq.heappush(self._removal_heap, (time.monotonic() + COMPLETED_JOB_DISPLAY_SECONDS, job_id))
+            if self._removal_thread is None or not self._removal_thread.is_alive():
+                self._removal_thread = threading.Thread(target=self._removal_worker, daemon=True)
+                self._removal_thread.start()
+            self._removal_cv.notify()
+    
+    def _removal_worker(self):
+        """Delete completed jobs as their display time runs out, sleeping until the next one is due."""
+        while True:
+            with self._removal_cv:
+                while not self._removal_heap:
+                    self._removal_cv.wait()
+                delay = self._removal_heap[0][0] - time.monotonic()
+                if delay > 0:
+                    self._removal_cv.wait(delay)
+                    continue
+                due = []
+                now = time.monotonic()
+                while self._removal_heap and self._removal_heap[0][0] <= now:
+                    due.append(heapq.heappop(self._removal_heap)[1])
+            
+            for job_id in due:
+                if self.job_store.delete_job(job_id):
+                    logger.info(f"Job {job_id} automatically removed from store after completion")
+                else:
+                    logger.warning(f"Failed to auto-remove completed job {job_id}")
+
     def _on_file_in_completed(self, file_path: str, relative_path: str):
         """
         Handle files detected in completed folder - find existing job and use AI-generated path to organize.
         If no job exists with AI-generated name, skip the file.
         """
         logger.info(f"File detected in completed folder: {relative_path}")
-        logger.debug(f"Full path: {file_path}")
+        logger.debug("Full path: %s", file_path)
         
         # Find existing job by matching the filename (basename)
         filename = os.path.basename(file_path)
-        matching_job = None
-        
-        for job in self.job_store.get_all_jobs():
-            # Match by basename of original_path
-            job_filename = os.path.basename(job.original_path)
-            if job_filename == filename:
-                matching_job = job
-                logger.debug(f"Found matching job {job.job_id} for file {filename}")
-                break
+        matching_job = self.job_store.find_job_by_filename(filename)
+        if matching_job:
+            logger.debug("Found matching job %s for file %s", matching_job.job_id, filename)
         
         if not matching_job:
             logger.warning(f"No matching job found for file in completed folder: {filename}")
@@ -864,20 +1035,47 @@ class BackendOrchestrator:
             return
         
         # Update job's original_path to reflect new location in completed folder
-        matching_job.original_path = file_path
+        self.job_store.set_job_path(matching_job.job_id, file_path)
         
         logger.info(f"Using AI-generated path from job {matching_job.job_id} to organize file")
         logger.info(f"Target: {matching_job.suggested_name}")
         
-        # Use the existing _organize_file method with AI-generated path
-        self._organize_file(matching_job, file_path)
+        # Use the existing _organize_file method with AI-generated path, off the watchdog thread
+        # so one slow (e.g. cross-device) move does not hold up the events behind it
+        with self._organizing_lock:
+            if matching_job.job_id in self._organizing:
+                logger.debug("Job %s is already being organized, ignoring duplicate event", matching_job.job_id)
+                return
+            self._organizing.add(matching_job.job_id)
+        
+        if self._fs_pool is None:
+            self._organize_job_task(matching_job, file_path)
+        else:
+            self._fs_pool.submit(self._organize_job_task, matching_job, file_path)
+    
+    def _organize_job_task(self, job, file_path: str):
+        try:
+            self._organize_file(job, file_path)
+        finally:
+            with self._organizing_lock:
+                self._organizing.discard(job.job_id)
 
     def _on_config_change(self, old_config, new_config):
-        logger.info("Configuration changed, updating watchers...")
-        logger.debug(f"Old config keys: {list(old_config.keys())}")
-        logger.debug(f"New config keys: {list(new_config.keys())}")
+        if any(old_config.get(key) != new_config.get(key) for key in CACHE_INVALIDATING_CONFIG_KEYS):
+            logger.info("AI provider or model changed, clearing cached AI responses")
+            self.ai_processor.invalidate_cache()
+        
+        changed = [key for key in WATCHED_CONFIG_KEYS if old_config.get(key) != new_config.get(key)]
+        if not changed:
+            logger.debug("Configuration changed; watched folders unchanged")
+            return
+        
+        logger.info(f"Configuration changed ({', '.join(changed)}), updating watchers...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Old config keys: %s", list(old_config.keys()))
+            logger.debug("New config keys: %s", list(new_config.keys()))
         
-        if old_config.get('DOWNLOADING_PATH') != new_config.get('DOWNLOADING_PATH'):
+        if 'DOWNLOADING_PATH' in changed:
             new_downloading_path = new_config.get('DOWNLOADING_PATH')
             logger.info(f"Downloading path changed: {old_config.get('DOWNLOADING_PATH')} -> {new_downloading_path}")
             if self.downloading_watcher:
@@ -885,49 +1083,50 @@ class BackendOrchestrator:
                 self.downloading_watcher.restart(new_downloading_path)
                 logger.debug("Downloading watcher restarted with new path")
         
-        if old_config.get('COMPLETED_PATH') != new_config.get('COMPLETED_PATH'):
+        if 'COMPLETED_PATH' in changed:
             new_completed_path = new_config.get('COMPLETED_PATH')
             logger.info(f"Completed path changed: {old_config.get('COMPLETED_PATH')} -> {new_completed_path}")
             if self.completed_watcher:
                 self.completed_watcher.handler.update_base_path(new_completed_path)
                 self.completed_watcher.restart(new_completed_path)
                 logger.debug("Completed watcher restarted with new path")
+        
+        if 'WATCH_MODE' in changed or 'POLL_INTERVAL_SECONDS' in changed:
+            watch_mode = new_config.get('WATCH_MODE', 'auto')
+            poll_interval = max(MIN_POLL_INTERVAL_SECONDS, float(new_config.get('POLL_INTERVAL_SECONDS', 5)))
+            logger.info(f"Watch mode changed: {watch_mode} (poll interval {poll_interval}s)")
+            for watcher in (self.downloading_watcher, self.completed_watcher):
+                if watcher:
+                    watcher.watch_mode = watch_mode
+                    watcher.poll_interval = poll_interval
+                    watcher.restart(watcher.path)
 
     def manual_edit_job(self, job_id: str, new_name: str, new_path: Optional[str] = None):
         logger.info(f"Manual edit requested for job {job_id}")
-        logger.debug(f"New name: {new_name}, New path: {new_path}")
+        logger.debug("New name: %s, New path: %s", new_name, new_path)
         
-        job = self.job_store.get_job(job_id)
-        if not job:
-            logger.warning(f"Job {job_id} not found for manual edit")
-            return False
-        
-        logger.info(f"Updating job {job_id} with manual edits")
-        self.job_store.update_job(
+        # update_job returns False for unknown jobs, so lookup and edit are one locked step
+        if not self.job_store.update_job(
             job_id,
-            JobStatus.MANUAL_EDIT,
+            JobStatus.PENDING_COMPLETION,
             suggested_name=new_name,
             new_path=new_path
-        )
+        ):
+            logger.warning(f"Job {job_id} not found for manual edit")
+            return False
         
-        self.job_store.update_job(job_id, JobStatus.PENDING_COMPLETION)
         logger.info(f"Job {job_id} marked as PENDING_COMPLETION after manual edit")
+        self.wake_queue()
         
         return True
 
     def re_ai_job(self, job_id: str, custom_prompt: Optional[str] = None, include_instructions: bool = True, include_filename: bool = True, enable_web_search: bool = False, enable_tmdb_tool: bool = False, enable_openlibrary_tool: bool = False, enable_comicvine_tool: bool = False, enable_musicbrainz_tool: bool = False):
         logger.info(f"Re-AI requested for job {job_id}")
-        logger.debug(f"Custom prompt: {bool(custom_prompt)}, Include instructions: {include_instructions}, Include filename: {include_filename}, Web search: {enable_web_search}, TMDB tool: {enable_tmdb_tool}, OpenLibrary tool: {enable_openlibrary_tool}, ComicVine tool: {enable_comicvine_tool}")
-        
-        job = self.job_store.get_job(job_id)
-        if not job:
-            logger.warning(f"Job {job_id} not found for re-AI")
-            return False
+        logger.debug("Custom prompt: %s, Include instructions: %s, Include filename: %s, Web search: %s, TMDB tool: %s, OpenLibrary tool: %s, ComicVine tool: %s", bool(custom_prompt), include_instructions, include_filename, enable_web_search, enable_tmdb_tool, enable_openlibrary_tool, enable_comicvine_tool)
         
-        logger.info(f"Queueing job {job_id} for priority AI processing")
-        self.job_store.update_job(
+        # Refuse while a worker holds the job, otherwise a second run would race the first
+        old_status = self.job_store.requeue_for_ai(
             job_id,
-            JobStatus.QUEUED_FOR_AI,
             custom_prompt=custom_prompt,
             priority=True,
             include_instructions=include_instructions,
@@ -938,7 +1137,15 @@ class BackendOrchestrator:
             enable_comicvine_tool=enable_comicvine_tool,
             enable_musicbrainz_tool=enable_musicbrainz_tool
         )
+        if old_status is None:
+            logger.warning(f"Job {job_id} not found for re-AI")
+            return False
+        if old_status == JobStatus.PROCESSING_AI:
+            logger.warning(f"Job {job_id} is already being processed by AI, re-AI refused")
+            return False
+        
         logger.info(f"Job {job_id} marked as QUEUED_FOR_AI with priority=True")
+        self.wake_queue()
         
         return True
 
@@ -973,13 +1180,11 @@ class BackendOrchestrator:
         downloading_path = self.config_manager.get('DOWNLOADING_PATH')
         completed_path = self.config_manager.get('COMPLETED_PATH')
         
-        # Get all jobs that are not yet completed
-        active_jobs = [
-            job for job in self.job_store.get_all_jobs()
-            if job.status not in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.AGENT_NAMED]
-        ]
-        
-        for job in active_jobs:
+        # Walk jobs that are not yet completed
+        for job in self.job_store.iter_jobs():
+            if job.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.AGENT_NAMED):
+                continue
+            
             # Check if file exists in either downloading or completed folder
             downloading_file_path = os.path.join(downloading_path, job.relative_path)
             
@@ -998,9 +1203,9 @@ class BackendOrchestrator:
                 # Check if we've already noted this file as missing
                 if job._missing_since is None:
                     # First time noticing it's missing, record the time
-                    job._missing_since = time.time()
-                    logger.debug(f"File missing for job {job.job_id}: {job.relative_path}")
-                elif time.time() - job._missing_since >= 5:
+                    job._missing_since = time.monotonic()
+                    logger.debug("File missing for job %s: %s", job.job_id, job.relative_path)
+                elif time.monotonic() - job._missing_since >= 5:
                     # File has been missing for 5+ seconds, remove the job
                     logger.info(f"File has been missing for 5+ seconds, removing job {job.job_id}: {job.relative_path}")
                     self.job_store.delete_job(job.job_id)
@@ -1008,33 +1213,61 @@ class BackendOrchestrator:
                 # File exists, clear any missing flag
                 job._missing_since = None
 
-    def _cleanup_empty_directories(self, base_path: str):
-        """Remove empty directories (including subdirectories) from the specified folder."""
-        try:
-            # Walk the directory tree bottom-up so we can remove empty subdirectories first
-            for root, dirs, files in os.walk(base_path, topdown=False):
-                for dir_name in dirs:
-                    dir_path = os.path.join(root, dir_name)
-                    try:
-                        # Try to remove the directory (will only work if empty)
-                        if not os.listdir(dir_path):
-                            os.rmdir(dir_path)
-                            logger.info(f"Removed empty directory: {dir_path}")
-                    except OSError:
-                        # Directory not empty or other error, skip
-                        pass
-        except Exception as e:
-            logger.error(f"Error cleaning up empty directories in {base_path}: {type(e).__name__}: {e}", exc_info=True)
+    @staticmethod
+    def _prune_empty_parents(directory: str, base_path: str):
+        """Remove directory, then each parent in turn, while they are empty. base_path itself is kept.
+        
+        Only the moved file's own ancestors are visited, so the cost is the folder depth rather
+        than a walk of the whole tree.
+        """
+        base = os.path.abspath(base_path)
+        current = os.path.abspath(directory)
+        while current.startswith(base + os.sep):
+            try:
+                # rmdir refuses non-empty directories, so it doubles as the emptiness check
+                os.rmdir(current)
+                logger.info(f"Removed empty directory: {current}")
+            except FileNotFoundError:
+                pass
+            except OSError:
+                break
+            current = os.path.dirname(current)
 
     def _trigger_jellyfin_refresh(self):
-        """Trigger Jellyfin library refresh if enabled in config."""
-        try:
-            jellyfin_enabled = self.config_manager.get('JELLYFIN_REFRESH_ENABLED', False)
-            
-            if not jellyfin_enabled:
-                logger.debug("Jellyfin refresh is disabled, skipping")
-                return
+        """Schedule a Jellyfin library refresh if enabled in config, without blocking the caller.
+        
+        Requests made within JELLYFIN_REFRESH_DEBOUNCE_SECONDS of the first pending one coalesce,
+        so a burst of organised files triggers a single library scan.
+        """
+        if not self.config_manager.get('JELLYFIN_REFRESH_ENABLED', False):
+            logger.debug("Jellyfin refresh is disabled, skipping")
+            return
+        
+        with self._jellyfin_cv:
+            if self._jellyfin_due is None:
+                self._jellyfin_due = time.monotonic() + JELLYFIN_REFRESH_DEBOUNCE_SECONDS
+            if self._jellyfin_thread is None or not self._jellyfin_thread.is_alive():
+                self._jellyfin_thread = threading.Thread(target=self._jellyfin_worker, daemon=True)
+                self._jellyfin_thread.start()
+            self._jellyfin_cv.notify()
+    
+    def _jellyfin_worker(self):
+        """Send each scheduled Jellyfin refresh once its debounce window has passed."""
+        while True:
+            with self._jellyfin_cv:
+                while self._jellyfin_due is None:
+                    self._jellyfin_cv.wait()
+                delay = self._jellyfin_due - time.monotonic()
+                if delay > 0:
+                    self._jellyfin_cv.wait(delay)
+                    continue
+                self._jellyfin_due = None
             
+            self._refresh_jellyfin()
+    
+    def _refresh_jellyfin(self):
+        """POST a library refresh to Jellyfin."""
+        try:
             # Jellyfin address is hardcoded
             jellyfin_address = "http://localhost:8096"
             # Get API key from configuration
@@ -1050,7 +1283,7 @@ class BackendOrchestrator:
             logger.info(f"Triggering Jellyfin library refresh at {jellyfin_address}")
             
             # Make the POST request
-            response = requests.post(refresh_url, timeout=10)
+            response = self._jellyfin_session.post(refresh_url, timeout=10)
             
             if response.status_code in [200, 204]:
                 logger.info("Jellyfin library refresh triggered successfully")
@@ -8,6 +8,8 @@ import logging
 import requests
 from typing import Dict, List, Optional
 
+from backend import json_utils
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,14 +34,14 @@ class ComicVineClient:
         try:
             response = requests.get(url, headers=self.headers, params=params, timeout=15)
             response.raise_for_status()
-            data = response.json()
+            data = json_utils.loads(response.content)
 
             if data.get('status_code') != 1:
                 logger.error(f"Comic Vine API error: {data.get('error', 'Unknown error')}")
                 return None
 
             return data
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"Comic Vine API request failed for {endpoint}: {e}")
             return None
 
@@ -1,7 +1,8 @@
 import json
 import os
 import threading
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
@@ -67,6 +68,12 @@ class ConfigManager:
             "ENABLE_SMART_AGENT": True,
             "BATCH_PATIENCE_SECONDS": 30,
             "AI_CALL_DELAY_SECONDS": 2,
+            "AI_CONCURRENCY": 4,
+            "AI_CACHE_TTL_SECONDS": 3600,
+            "SHARD_SIZE": 40,
+            "FS_WORKERS": 4,
+            "WATCH_MODE": "auto",
+            "POLL_INTERVAL_SECONDS": 5,
             "JELLYFIN_REFRESH_ENABLED": False,
             "APP_PASSWORD": "",
             "ADMIN_PASSWORD": "",
@@ -94,6 +101,11 @@ class ConfigManager:
         with self._lock:
             return self._config.copy()
 
+    def snapshot(self) -> Mapping[str, Any]:
+        """Return a read-only point-in-time view of the configuration."""
+        with self._lock:
+            return MappingProxyType(self._config.copy())
+
     def set(self, key: str, value: Any):
         with self._lock:
             self._config[key] = value
@@ -1,11 +1,54 @@
 import os
 import time
+import re
+import fnmatch
 import threading
 from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
 from watchdog.events import FileSystemEventHandler
 from typing import Callable, Optional
 from pathlib import Path
 
+# Partial-download files written by browsers and torrent clients; the finished
+# file arrives later as its own create/move event
+IGNORED_FILE_PATTERNS = ('*.part', '*.tmp', '*.!qb', '*.crdownload')
+# One compiled alternation, matched once per event instead of looping over the patterns
+_IGNORED_FILE_RE = re.compile('|'.join(fnmatch.translate(p) for p in IGNORED_FILE_PATTERNS), re.IGNORECASE)
+
+
+def is_ignored_file(file_path: str) -> bool:
+    return _IGNORED_FILE_RE.match(os.path.basename(file_path)) is not None
+
+
+# Floor for POLL_INTERVAL_SECONDS; shorter intervals just burn CPU re-scanning the tree
+MIN_POLL_INTERVAL_SECONDS = 1.0
+
+
+# Filesystem types (prefix match against /proc/mounts) where inotify misses changes made by other hosts
+NETWORK_FS_PREFIXES = ('nfs', 'cifs', 'smb', 'fuse.sshfs', '9p', 'afs')
+
+
+def is_network_filesystem(path: str) -> bool:
+    """True if path lives on a network mount. Always False where /proc/mounts is unavailable."""
+    try:
+        with open('/proc/mounts', 'r', encoding='utf-8') as f:
+            mounts = f.read().splitlines()
+    except OSError:
+        return False
+    
+    real_path = os.path.realpath(path)
+    best_mount, best_type = '', ''
+    for line in mounts:
+        fields = line.split()
+        if len(fields) < 3:
+            continue
+        # Mount points escape spaces and other specials as octal, e.g. \040
+        mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), fields[1])
+        inside = real_path == mount_point or real_path.startswith(mount_point.rstrip('/') + '/')
+        if inside and len(mount_point) >= len(best_mount):
+            best_mount, best_type = mount_point, fields[2]
+    return best_type.startswith(NETWORK_FS_PREFIXES)
+
 
 class DownloadingFolderHandler(FileSystemEventHandler):
     def __init__(self, callback: Callable[[str, str], None], base_path: str):
@@ -18,12 +61,16 @@ class DownloadingFolderHandler(FileSystemEventHandler):
     def on_created(self, event):
         if not event.is_directory:
             file_path = event.src_path
+            if is_ignored_file(file_path):
+                return
             relative_path = os.path.relpath(file_path, self.base_path)
             self.callback(file_path, relative_path)
 
     def on_moved(self, event):
         if not event.is_directory:
             file_path = event.dest_path
+            if is_ignored_file(file_path):
+                return
             relative_path = os.path.relpath(file_path, self.base_path)
             self.callback(file_path, relative_path)
 
@@ -40,34 +87,54 @@ class CompletedFolderHandler(FileSystemEventHandler):
     def on_created(self, event):
         if not event.is_directory:
             file_path = event.src_path
+            if is_ignored_file(file_path):
+                return
             relative_path = os.path.relpath(file_path, self.base_path)
             self.callback(file_path, relative_path)
 
     def on_moved(self, event):
         if not event.is_directory:
             file_path = event.dest_path
+            if is_ignored_file(file_path):
+                return
             relative_path = os.path.relpath(file_path, self.base_path)
             self.callback(file_path, relative_path)
 
 
 class FileWatcher:
-    def __init__(self, path: str, handler: FileSystemEventHandler):
+    def __init__(self, path: str, handler: FileSystemEventHandler,
+                 watch_mode: str = 'auto', poll_interval: float = 5):
         self.path = path
         self.handler = handler
+        # 'native' (inotify/FSEvents), 'polling', or 'auto' to poll only on network mounts
+        self.watch_mode = watch_mode
+        self.poll_interval = poll_interval
         self.observer: Optional[Observer] = None
         self._running = False
 
+    def _use_polling(self) -> bool:
+        if self.watch_mode == 'polling':
+            return True
+        if self.watch_mode == 'auto':
+            return is_network_filesystem(self.path)
+        return False
+
     def start(self):
         if self._running:
             return
         
         os.makedirs(self.path, exist_ok=True)
         
-        self.observer = Observer()
+        if self._use_polling():
+            self.observer = PollingObserver(timeout=self.poll_interval)
+            mode = f"polling every {self.poll_interval}s"
+        else:
+            self.observer = Observer()
+            mode = "native"
         self.observer.schedule(self.handler, self.path, recursive=True)
         self.observer.start()
         self._running = True
-        print(f"Started watching: {self.path} (recursive)")
+        print(f"Started watching: {self.path} (recursive, {mode})")
 
     def stop(self):
         if self.observer and self._running:
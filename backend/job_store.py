@@ -1,10 +1,12 @@
+import heapq
+import itertools
 import json
 import logging
 import os
 import threading
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -55,7 +57,8 @@ class Job:
         self.enable_musicbrainz_tool: bool = False
         self.retry_count: int = 0
         self.max_retries: int = 3
-        self._missing_since: Optional[float] = None
+        self._missing_since: Optional[float] = None  # time.monotonic() when the file was first found missing
+        self._ready_seq: Optional[int] = None  # JobStore ready-heap entry currently representing this job
         self.completed_file_path: Optional[str] = None
         self.group_id: Optional[str] = None  # Links files with same base name
         self.is_group_primary: bool = False  # First file in a group is primary
@@ -97,15 +100,60 @@ class Job:
                 setattr(self, key, value)
 
 
+def _stem_key(relative_path: str) -> Tuple[str, str]:
+    """(directory, base name without extension) used to group sibling files."""
+    return os.path.dirname(relative_path), os.path.splitext(os.path.basename(relative_path))[0]
+
+
 class JobStore:
     def __init__(self):
         self._jobs: Dict[str, Job] = {}
         self._lock = threading.RLock()
+        # Lookup indexes, each key -> jobs in insertion order; kept in step with _jobs
+        self._by_path: Dict[str, List[Job]] = {}  # original_path and relative_path
+        self._by_filename: Dict[str, List[Job]] = {}  # basename of original_path
+        self._by_stem: Dict[Tuple[str, str], List[Job]] = {}  # _stem_key(relative_path)
+        # status -> {job_id: job}, in the order jobs entered that status
+        self._by_status: Dict[JobStatus, Dict[str, Job]] = {status: {} for status in JobStatus}
+        # (tier, seq, job_id) pushed whenever a job is queued for AI; tier 0 is priority.
+        # Only the entry matching job._ready_seq is live; the rest are discarded lazily
+        self._ready_heap: List[Tuple[int, int, str]] = []
+        self._ready_seq = itertools.count()
+
+    def _index_keys(self, job: Job):
+        return (
+            (self._by_path, job.original_path),
+            (self._by_path, job.relative_path),
+            (self._by_filename, os.path.basename(job.original_path)),
+            (self._by_stem, _stem_key(job.relative_path)),
+        )
+
+    def _index_job_locked(self, job: Job):
+        self._by_status[job.status][job.job_id] = job
+        for index, key in self._index_keys(job):
+            bucket = index.setdefault(key, [])
+            if job not in bucket:
+                bucket.append(job)
+
+    def _unindex_job_locked(self, job: Job):
+        self._by_status[job.status].pop(job.job_id, None)
+        for index, key in self._index_keys(job):
+            bucket = index.get(key)
+            if bucket and job in bucket:
+                bucket.remove(job)
+                if not bucket:
+                    del index[key]
+
+    def _push_ready_locked(self, job: Job):
+        job._ready_seq = next(self._ready_seq)
+        heapq.heappush(self._ready_heap, (0 if job.priority else 1, job._ready_seq, job.job_id))
 
     def add_job(self, original_path: str, relative_path: str) -> Job:
         with self._lock:
             job = Job(original_path, relative_path)
             self._jobs[job.job_id] = job
+            self._index_job_locked(job)
+            self._push_ready_locked(job)
             return job
 
     def get_job(self, job_id: str) -> Optional[Job]:
@@ -114,65 +162,166 @@ class JobStore:
 
     def get_job_by_path(self, path: str) -> Optional[Job]:
         with self._lock:
-            for job in self._jobs.values():
-                if job.original_path == path or job.relative_path == path:
-                    return job
-            return None
+            jobs = self._by_path.get(path)
+            return jobs[0] if jobs else None
 
-    def get_jobs_by_status(self, status: JobStatus) -> List[Job]:
+    def find_job_by_filename(self, filename: str) -> Optional[Job]:
+        """Find the first job whose original file has this basename."""
         with self._lock:
-            return [job for job in self._jobs.values() if job.status == status]
+            jobs = self._by_filename.get(filename)
+            return jobs[0] if jobs else None
+
+    def find_sibling_job(self, relative_path: str) -> Optional[Job]:
+        """Find the first job in the same directory with the same base name (any extension)."""
+        with self._lock:
+            jobs = self._by_stem.get(_stem_key(relative_path))
+            return jobs[0] if jobs else None
+
+    def set_job_path(self, job_id: str, original_path: str) -> bool:
+        """Point a job at its file's new location, keeping the lookup indexes current."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return False
+            self._unindex_job_locked(job)
+            job.original_path = original_path
+            self._index_job_locked(job)
+            return True
+
+    def get_jobs_by_status(self, status: JobStatus, priority: Optional[bool] = None) -> List[Job]:
+        """Jobs in status, in the order they entered it; pass priority to keep only matching jobs."""
+        with self._lock:
+            jobs = self._by_status[status].values()
+            if priority is None:
+                return list(jobs)
+            return [job for job in jobs if job.priority == priority]
 
     def get_all_jobs(self) -> List[Job]:
         with self._lock:
             return list(self._jobs.values())
 
+    def iter_jobs(self) -> Iterator[Job]:
+        """Yield jobs one at a time without holding the lock between them.
+        
+        Only the id list is copied up front; jobs deleted mid-iteration are skipped,
+        so callers can stop early or delete as they go.
+        """
+        with self._lock:
+            job_ids = list(self._jobs)
+        for job_id in job_ids:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                yield job
+
     def update_job(self, job_id: str, status: JobStatus, **kwargs) -> bool:
+        with self._lock:
+            old_status = self._update_job_locked(job_id, status, kwargs)
+            if old_status is None:
+                return False
+            if status == JobStatus.PENDING_COMPLETION or old_status == JobStatus.PENDING_COMPLETION:
+                self._save_pending_jobs_locked()
+            return True
+
+    def requeue_for_ai(self, job_id: str, **kwargs) -> Optional[JobStatus]:
+        """Queue a job for AI again unless a worker is already processing it.
+        
+        Returns the job's previous status, or None if the job is unknown. Nothing is
+        changed when that status is PROCESSING_AI.
+        """
         with self._lock:
             job = self._jobs.get(job_id)
-            if job:
-                old_status = job.status
-                job.update_status(status, **kwargs)
+            if not job:
+                return None
+            if job.status == JobStatus.PROCESSING_AI:
+                return job.status
+            old_status = self._update_job_locked(job_id, JobStatus.QUEUED_FOR_AI, kwargs)
+            if old_status == JobStatus.PENDING_COMPLETION:
+                self._save_pending_jobs_locked()
+            return old_status
+
+    def update_jobs_bulk(self, updates: List[Tuple[str, JobStatus, Dict]]) -> int:
+        """Apply several (job_id, status, kwargs) updates under one lock acquisition.
+        
+        The pending-jobs file is rewritten at most once for the whole batch.
+        Returns the number of jobs that were found and updated.
+        """
+        updated = 0
+        save_pending = False
+        with self._lock:
+            for job_id, status, kwargs in updates:
+                old_status = self._update_job_locked(job_id, status, kwargs)
+                if old_status is None:
+                    continue
+                updated += 1
                 if status == JobStatus.PENDING_COMPLETION or old_status == JobStatus.PENDING_COMPLETION:
-                    self._save_pending_jobs_locked()
-                return True
-            return False
+                    save_pending = True
+            if save_pending:
+                self._save_pending_jobs_locked()
+        return updated
+
+    def _update_job_locked(self, job_id: str, status: JobStatus, kwargs: Dict) -> Optional[JobStatus]:
+        """Update one job and its indexes. Returns the previous status, or None if the job is unknown."""
+        job = self._jobs.get(job_id)
+        if not job:
+            return None
+        old_status = job.status
+        reindex = 'original_path' in kwargs or 'relative_path' in kwargs
+        if reindex:
+            self._unindex_job_locked(job)
+        elif status != old_status:
+            del self._by_status[old_status][job_id]
+            self._by_status[status][job_id] = job
+        job.update_status(status, **kwargs)
+        if reindex:
+            self._index_job_locked(job)
+        if status == JobStatus.QUEUED_FOR_AI and (old_status != status or 'priority' in kwargs):
+            self._push_ready_locked(job)
+        return old_status
 
     def delete_job(self, job_id: str) -> bool:
         with self._lock:
             if job_id in self._jobs:
                 was_pending = self._jobs[job_id].status == JobStatus.PENDING_COMPLETION
-                del self._jobs[job_id]
+                self._unindex_job_locked(self._jobs.pop(job_id))
                 if was_pending:
                     self._save_pending_jobs_locked()
                 return True
             return False
 
     def get_priority_jobs(self) -> List[Job]:
+        return self.get_jobs_by_status(JobStatus.QUEUED_FOR_AI, priority=True)
+
+    def next_queued_job(self) -> Optional[Job]:
+        """Return the oldest priority job queued for AI, else the oldest queued job, without dequeuing it."""
         with self._lock:
-            return [job for job in self._jobs.values() 
-                   if job.priority and job.status == JobStatus.QUEUED_FOR_AI]
+            heap = self._ready_heap
+            while heap:
+                _, seq, job_id = heap[0]
+                job = self._jobs.get(job_id)
+                if job is not None and job._ready_seq == seq and job.status == JobStatus.QUEUED_FOR_AI:
+                    return job
+                heapq.heappop(heap)
+            return None
     
     def get_failed_jobs_for_retry(self) -> List[Job]:
         """Get failed jobs that haven't exceeded max retries."""
         with self._lock:
-            return [job for job in self._jobs.values() 
-                   if job.status == JobStatus.FAILED and job.retry_count < job.max_retries]
+            return [job for job in self._by_status[JobStatus.FAILED].values()
+                   if job.retry_count < job.max_retries]
 
     def clear_completed_jobs(self, days: int = 7):
         with self._lock:
             cutoff = datetime.now().timestamp() - (days * 24 * 60 * 60)
             to_delete = [
-                job_id for job_id, job in self._jobs.items()
-                if job.status == JobStatus.COMPLETED 
-                and job.updated_at.timestamp() < cutoff
+                job_id for job_id, job in self._by_status[JobStatus.COMPLETED].items()
+                if job.updated_at.timestamp() < cutoff
             ]
             for job_id in to_delete:
-                del self._jobs[job_id]
+                self._unindex_job_locked(self._jobs.pop(job_id))
 
     def _save_pending_jobs_locked(self):
         """Persist all PENDING_COMPLETION jobs to JSON. Lock must be held."""
-        pending_jobs = [j for j in self._jobs.values() if j.status == JobStatus.PENDING_COMPLETION]
+        pending_jobs = list(self._by_status[JobStatus.PENDING_COMPLETION].values())
         data = []
         for job in pending_jobs:
             data.append({
@@ -264,6 +413,7 @@ class JobStore:
                 job.force_overwrite = item.get('force_overwrite', False)
                 job.batch_id = item.get('batch_id')
                 self._jobs[job.job_id] = job
+                self._index_job_locked(job)
                 loaded += 1
         
         logger.info(f"Restored {loaded} pending job(s) from {PENDING_JOBS_FILE}")
@@ -280,7 +430,7 @@ class JobStore:
             Compact list of {relative_path, suggested_name, confidence} dicts.
         """
         with self._lock:
-            pending = [j for j in self._jobs.values() if j.status == JobStatus.PENDING_COMPLETION]
+            pending = list(self._by_status[JobStatus.PENDING_COMPLETION].values())
         
         query_lower = query.lower()
         results = []
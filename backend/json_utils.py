@@ -0,0 +1,101 @@
+"""JSON helpers shared by the AI processor and the smart agent.
+
+Uses orjson when it is installed and falls back to the stdlib json module otherwise.
+"""
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+if orjson is not None:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers keep catching the stdlib type
+    loads = orjson.loads
+
+    def dumps_pretty(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def encode_body(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+else:
+    loads = json.loads
+
+    def dumps_pretty(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+    def encode_body(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+
+def repair_truncated_json(raw: str):
+    """Try to salvage a truncated JSON string by closing unclosed structures."""
+    raw = raw.strip()
+    if not raw:
+        return None
+
+    last_conf = raw.rfind('"confidence":')
+    if last_conf > 0:
+        brace_pos = raw.rfind('{', last_conf)
+        if brace_pos > 0:
+            cleaned = raw[:brace_pos].rstrip().rstrip(',')
+            cleaned += '\n  ]\n}'
+            try:
+                loads(cleaned)
+                logger.info("Repaired truncated JSON by snipping incomplete entry")
+                return cleaned
+            except json.JSONDecodeError:
+                pass
+
+    in_string = False
+    for i, ch in enumerate(raw):
+        if ch == '"' and (i == 0 or raw[i-1] != '\\\\'):
+            in_string = not in_string
+    if in_string:
+        cleaned = raw + '"'
+        open_braces = cleaned.count('{') - cleaned.count('}')
+        open_brackets = cleaned.count('[') - cleaned.count(']')
+        cleaned += '}' * max(0, open_braces)
+        cleaned += ']' * max(0, open_brackets)
+        try:
+            loads(cleaned)
+            logger.info("Repaired truncated JSON by closing unterminated string")
+            return cleaned
+        except json.JSONDecodeError:
+            pass
+
+    cleaned = raw.rstrip().rstrip(',').rstrip('\n').rstrip('\r')
+    open_braces = cleaned.count('{') - cleaned.count('}')
+    open_brackets = cleaned.count('[') - cleaned.count(']')
+    cleaned += '}' * max(0, open_braces)
+    cleaned += ']' * max(0, open_brackets)
+    try:
+        loads(cleaned)
+        logger.info("Repaired truncated JSON by brute-force closing")
+        return cleaned
+    except json.JSONDecodeError:
+        pass
+
+    return None
+
+
+def safe_parse_json(raw: str, context_name: str):
+    """Parse tool-call arguments, repairing truncated JSON where possible. Returns None if unrecoverable."""
+    try:
+        return loads(raw)
+    except json.JSONDecodeError as e:
+        logger.warning(f"Truncated JSON in {context_name}: {e} (raw length={len(raw)})")
+        repaired = repair_truncated_json(raw)
+        if repaired:
+            try:
+                result = loads(repaired)
+                logger.info(f"Successfully repaired truncated JSON for {context_name} "
+                            f"(original={len(raw)} chars, repaired={len(repaired)})")
+                return result
+            except json.JSONDecodeError:
+                pass
+        logger.error(f"Unrecoverable JSON in {context_name}: {raw[:200]}...")
+        return None
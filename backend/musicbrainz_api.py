@@ -8,6 +8,8 @@ import logging
 import requests
 from typing import Dict, List, Optional
 
+from backend import json_utils
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,8 +34,8 @@ class MusicBrainzClient:
         try:
             response = requests.get(url, headers=self.headers, params=params, timeout=15)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return json_utils.loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"MusicBrainz API request failed for {endpoint}: {e}")
             return None
 
@@ -385,16 +387,16 @@ def format_musicbrainz_response(result: Optional[Dict], query_type: str = 'relea
                     f"Length: {length_str}\n"
                     f"MusicBrainz ID: {result.get('id', 'N/A')}")
         if result.get('releases'):
-            response += "\nAppears on:"
-            for rel in result['releases'][:3]:
-                response += f"\n  - {rel['title']} ({rel.get('date', 'Unknown')}, {rel.get('status', '')})"
+            response += "\nAppears on:" + "".join(
+                f"\n  - {rel['title']} ({rel.get('date', 'Unknown')}, {rel.get('status', '')})"
+                for rel in result['releases'][:3])
         return response
 
     elif query_type == 'tracks':
-        response = (f"Album: {result['title']}\n"
-                    f"Artist: {result['artist']}\n"
-                    f"Release Date: {result.get('date', 'Unknown')}\n"
-                    f"Tracks ({result.get('track_count', 0)}):\n")
+        lines = [f"Album: {result['title']}\n"
+                 f"Artist: {result['artist']}\n"
+                 f"Release Date: {result.get('date', 'Unknown')}\n"
+                 f"Tracks ({result.get('track_count', 0)}):\n"]
 
         for track in result.get('tracks', [])[:50]:
             pos = track.get('position', '?')
@@ -410,8 +412,8 @@ def format_musicbrainz_response(result: Optional[Dict], query_type: str = 'relea
             track_artist = track.get('artist')
             artist_str = f" - {track_artist}" if track_artist else ""
             length_display = f" [{length_str}]" if length_str else ""
-            response += f"  {pos}. {title}{artist_str}{length_display}\n"
+            lines.append(f"  {pos}. {title}{artist_str}{length_display}\n")
 
-        return response
+        return "".join(lines)
 
     return str(result)
\ No newline at end of file
@@ -8,6 +8,8 @@ import logging
 import requests
 from typing import Dict, List, Optional
 
+from backend import json_utils
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,8 +30,8 @@ class OpenLibraryClient:
         try:
             response = requests.get(url, headers=self.headers, params=params, timeout=15)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return json_utils.loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"Open Library API request failed for {endpoint}: {e}")
             return None
 
@@ -0,0 +1,93 @@
+"""
+Persistent cache of AI naming responses.
+
+Stores parsed provider results in a small SQLite database keyed by a digest of the
+request, so identical requests are answered without a network round-trip, even
+across restarts.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from backend import json_utils
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_FILE = 'ai_response_cache.db'
+MAX_ENTRIES = 2000
+
+
+class ResponseCache:
+    def __init__(self, db_path: str = RESPONSE_CACHE_FILE, max_entries: int = MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, stored_at REAL NOT NULL, results TEXT NOT NULL)"
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            # Caching is an optimisation only; run uncached rather than fail startup
+            logger.error(f"Failed to open AI response cache at {db_path}: {e}")
+            self._conn = None
+
+    def get(self, key: str, ttl: float) -> Optional[List[Dict]]:
+        """Return cached results for key, or None if missing or older than ttl seconds."""
+        if self._conn is None:
+            return None
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT stored_at, results FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                stored_at, results = row
+                if time.time() - stored_at > ttl:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    return None
+            except sqlite3.Error as e:
+                logger.error(f"AI response cache read failed: {e}")
+                return None
+        return json_utils.loads(results)
+
+    def set(self, key: str, results: List[Dict]):
+        if self._conn is None:
+            return
+        payload = json_utils.encode_body(results).decode('utf-8')
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, stored_at, results) VALUES (?, ?, ?)",
+                    (key, time.time(), payload)
+                )
+                # Keep only the newest max_entries rows
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key NOT IN "
+                    "(SELECT key FROM responses ORDER BY stored_at DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"AI response cache write failed: {e}")
+
+    def clear(self) -> int:
+        """Drop every cached response. Returns the number of entries removed."""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            try:
+                removed = self._conn.execute("DELETE FROM responses").rowcount
+                self._conn.commit()
+                return removed
+            except sqlite3.Error as e:
+                logger.error(f"Failed to clear AI response cache: {e}")
+                return 0
@@ -13,10 +13,14 @@ from backend.tmdb_api import TMDBClient, format_tool_response
 from backend.openlibrary_api import OpenLibraryClient, format_openlibrary_response
 from backend.comicvine_api import ComicVineClient, format_comicvine_response
 from backend.musicbrainz_api import MusicBrainzClient, format_musicbrainz_response
+from backend import json_utils
+from backend.ai_processor import ollama_keep_alive
 
 logger = logging.getLogger(__name__)
 
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+GOOGLE_GENERATE_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+OLLAMA_GENERATE_PATH = "/api/generate"
 MAX_CONVERSATION_TURNS = 10
 
 AGENT_SYSTEM_PROMPT = """You are an expert media file organizer agent. Process batches of files by assigning each a proper destination path.
@@ -54,7 +58,9 @@ class SmartAgent:
         self.musicbrainz_client: Optional[MusicBrainzClient] = None
         self.openai_client: Optional[OpenAI] = None
         self.openrouter_client: Optional[OpenAI] = None
-        self.last_api_call_time = 0
+        self.last_api_call_time = 0.0
+        # (path, mtime_ns, content) of the last instructions file read
+        self._instructions_cache = None
         
         self._current_batch_id: Optional[str] = None
         self._named_count = 0
@@ -378,75 +384,6 @@ class SmartAgent:
         }
         return json.dumps(summary, indent=2)
 
-    @staticmethod
-    def _repair_truncated_json(raw: str):
-        """Try to salvage a truncated JSON string by closing unclosed structures."""
-        raw = raw.strip()
-        if not raw:
-            return None
-        
-        last_conf = raw.rfind('"confidence":')
-        if last_conf > 0:
-            brace_pos = raw.rfind('{', last_conf)
-            if brace_pos > 0:
-                cleaned = raw[:brace_pos].rstrip().rstrip(',')
-                cleaned += '\n  ]\n}'
-                try:
-                    json.loads(cleaned)
-                    logger.info("Repaired truncated JSON by snipping incomplete entry")
-                    return cleaned
-                except json.JSONDecodeError:
-                    pass
-        
-        in_string = False
-        for i, ch in enumerate(raw):
-            if ch == '"' and (i == 0 or raw[i-1] != '\\\\'):
-                in_string = not in_string
-        if in_string:
-            cleaned = raw + '"'
-            open_braces = cleaned.count('{') - cleaned.count('}')
-            open_brackets = cleaned.count('[') - cleaned.count(']')
-            cleaned += '}' * max(0, open_braces)
-            cleaned += ']' * max(0, open_brackets)
-            try:
-                json.loads(cleaned)
-                logger.info("Repaired truncated JSON by closing unterminated string")
-                return cleaned
-            except json.JSONDecodeError:
-                pass
-        
-        cleaned = raw.rstrip().rstrip(',').rstrip('\n').rstrip('\r')
-        open_braces = cleaned.count('{') - cleaned.count('}')
-        open_brackets = cleaned.count('[') - cleaned.count(']')
-        cleaned += '}' * max(0, open_braces)
-        cleaned += ']' * max(0, open_brackets)
-        try:
-            json.loads(cleaned)
-            logger.info("Repaired truncated JSON by brute-force closing")
-            return cleaned
-        except json.JSONDecodeError:
-            pass
-        
-        return None
-
-    @staticmethod
-    def _safe_parse_json(raw: str, context_name: str):
-        try:
-            return json.loads(raw)
-        except json.JSONDecodeError as e:
-            logger.warning(f"Truncated JSON in {context_name}: {e} (raw length={len(raw)})")
-            repaired = SmartAgent._repair_truncated_json(raw)
-            if repaired:
-                try:
-                    result = json.loads(repaired)
-                    logger.info(f"Successfully repaired truncated JSON for {context_name} "
-                                f"(original={len(raw)} chars, repaired={len(repaired)})")
-                    return result
-                except json.JSONDecodeError:
-                    pass
-            logger.error(f"Unrecoverable JSON in {context_name}: {raw[:200]}...")
-            return None
-
     def _execute_tool(self, function_name: str, args: Dict) -> str:
         """Execute a tool call locally and return the result string."""
         try:
@@ -528,21 +465,57 @@ class SmartAgent:
 
     def _enforce_rate_limit(self):
         delay = self.config_manager.get('AI_CALL_DELAY_SECONDS', 2)
-        elapsed = time.time() - self.last_api_call_time
+        elapsed = time.monotonic() - self.last_api_call_time
         if elapsed < delay:
             time.sleep(delay - elapsed)
 
+    def _post(self, url, payload, log_prefix, on_event=None, timeout=None, headers=None):
+        """POST JSON through the AI processor's pooled session with its 429/5xx retry, or plain requests as a fallback."""
+        headers = {'Content-Type': 'application/json', **(headers or {})}
+        if self.ai_processor is not None:
+            return self.ai_processor.post_with_retry(url, payload, log_prefix, timeout=timeout,
+                                                      on_event=on_event, headers=headers)
+        import requests
+        return requests.post(url, json=payload, headers=headers, timeout=timeout)
+
+    def _get_llm_client(self, use_openai: bool, api_key: str) -> OpenAI:
+        """Return an OpenAI/OpenRouter client, sharing the AI processor's clients when available."""
+        if self.ai_processor is not None:
+            if use_openai:
+                return self.ai_processor.get_openai_client(api_key)
+            return self.ai_processor.get_openrouter_client(api_key)
+        if use_openai:
+            if not self.openai_client or self.openai_client.api_key != api_key:
+                self.openai_client = OpenAI(api_key=api_key)
+            return self.openai_client
+        if not self.openrouter_client or self.openrouter_client.api_key != api_key:
+            self.openrouter_client = OpenAI(base_url=OPENROUTER_BASE_URL, api_key=api_key)
+        return self.openrouter_client
+    
     def _get_instructions(self) -> str:
         custom_path = './instruction_prompt_custom.md'
         base_path = './instruction_prompt.md'
         instructions_path = custom_path if os.path.exists(custom_path) else base_path
+        try:
+            mtime = os.stat(instructions_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        
+        # Only re-read the file when it has been switched or modified since the last call
+        cached = self._instructions_cache
+        if cached is not None and cached[0] == instructions_path and cached[1] == mtime:
+            return cached[2]
+        
         try:
             with open(instructions_path, 'r', encoding='utf-8') as f:
-                return f.read()
+                content = f.read()
         except FileNotFoundError:
-            return "Organize media files into the proper library structure."
+            content = "Organize media files into the proper library structure."
         except UnicodeDecodeError:
-            return "Organize media files into the proper library structure."
+            content = "Organize media files into the proper library structure."
+        
+        self._instructions_cache = (instructions_path, mtime, content)
+        return content
 
     def process_batch(self, file_paths: List[str], custom_prompt: Optional[str] = None,
                       on_event: Optional[Callable] = None) -> Dict:
@@ -568,8 +541,7 @@ class SmartAgent:
             return {"status": "failed", "named": 0, "failed": 0, "note": "No valid jobs", "batch_id": self._current_batch_id}
         
         self._batch_total = len(batch_jobs)
-        for j in batch_jobs:
-            self.job_store.update_job(j.job_id, JobStatus.PROCESSING_AI)
+        self.job_store.update_jobs_bulk([(j.job_id, JobStatus.PROCESSING_AI, {}) for j in batch_jobs])
         
         provider = self.config_manager.get('AI_PROVIDER', 'openrouter')
         
@@ -610,14 +582,7 @@ class SmartAgent:
         if not api_key:
             raise ValueError("API key not configured")
         
-        if self.config_manager.get('AI_PROVIDER') == 'openai':
-            if not self.openai_client:
-                self.openai_client = OpenAI(api_key=api_key)
-            client = self.openai_client
-        else:
-            if not self.openrouter_client:
-                self.openrouter_client = OpenAI(base_url=OPENROUTER_BASE_URL, api_key=api_key)
-            client = self.openrouter_client
+        client = self._get_llm_client(self.config_manager.get('AI_PROVIDER') == 'openai', api_key)
         
         model = self.config_manager.get('AI_MODEL', 'deepseek/deepseek-chat')
         tools = self._get_agent_tools_openai()
@@ -650,7 +615,7 @@ class SmartAgent:
         instructions = self._get_instructions()
         prompt = self._build_agent_prompt(file_paths, instructions, custom_prompt)
         
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
+        url = GOOGLE_GENERATE_URL.format(model=model)
         
         google_tools = self._build_google_tools()
         
@@ -672,7 +637,7 @@ class SmartAgent:
         if on_event:
             on_event({"type": "api_request", "provider": "google", "model": model, "tools": ["agent_tools"]})
         
-        return self._google_conversation_loop(url, payload, on_event)
+        return self._google_conversation_loop(url, payload, on_event, api_key)
 
     def _run_ollama_agent(self, batch_jobs, file_paths, custom_prompt, on_event):
         base_url = self.config_manager.get('OLLAMA_BASE_URL', 'http://localhost:11434')
@@ -685,11 +650,12 @@ class SmartAgent:
         if on_event:
             on_event({"type": "api_request", "provider": "ollama", "model": model, "tools": []})
         
-        url = f"{base_url}/api/generate"
+        url = base_url + OLLAMA_GENERATE_PATH
         payload = {
             "model": model,
             "prompt": full_prompt,
             "stream": False,
+            "keep_alive": ollama_keep_alive(self.config_manager.snapshot()),
             "options": {
                 "temperature": float(self.config_manager.get('OLLAMA_TEMPERATURE', 0.1)),
                 "num_predict": int(self.config_manager.get('OLLAMA_NUM_PREDICT', 2048)),
@@ -699,11 +665,10 @@ class SmartAgent:
         }
         
         self._enforce_rate_limit()
-        import requests
-        resp = requests.post(url, json=payload, timeout=120)
-        self.last_api_call_time = time.time()
+        resp = self._post(url, payload, "Ollama agent", on_event=on_event, timeout=120)
+        self.last_api_call_time = time.monotonic()
         resp.raise_for_status()
-        data = resp.json()
+        data = json_utils.loads(resp.content)
         text = data.get("response", "")
         
         return {"status": "success", "note": "Ollama agent completed", "raw_response": text[:500]}
@@ -711,8 +676,7 @@ class SmartAgent:
     def _build_agent_prompt(self, file_paths, instructions, custom_prompt):
         prompt = f"{instructions}\n\n"
         prompt += "FILES TO PROCESS:\n"
-        for fp in file_paths:
-            prompt += f"- {fp}\n"
+        prompt += "".join(f"- {fp}\n" for fp in file_paths)
         prompt += f"\nTotal: {len(file_paths)} files.\n\n"
         if len(file_paths) > 25:
             prompt += (f"LARGE BATCH: {len(file_paths)} files. If the set_names JSON would be too long, "
@@ -797,7 +761,7 @@ class SmartAgent:
             }
             response = client.chat.completions.create(**kwargs)
             req_duration = int((time.time() - req_start) * 1000)
-            self.last_api_call_time = time.time()
+            self.last_api_call_time = time.monotonic()
             
             message = response.choices[0].message
             messages.append(message)
@@ -811,7 +775,7 @@ class SmartAgent:
                 for tool_call in message.tool_calls:
                     func_name = tool_call.function.name
                     
-                    func_args = self._safe_parse_json(
+                    func_args = json_utils.safe_parse_json(
                         tool_call.function.arguments, func_name
                     )
                     if func_args is None:
@@ -859,25 +823,29 @@ class SmartAgent:
             "note": "Agent completed" if finish_requested else "Agent ended without finish_group"
         }
 
-    def _google_conversation_loop(self, url, payload, on_event):
-        import requests
+    def _google_conversation_loop(self, url, payload, on_event, api_key):
+        headers = {'x-goog-api-key': api_key}
         conversation = payload["contents"].copy()
         max_turns = MAX_CONVERSATION_TURNS
         
         for turn in range(max_turns):
             self._enforce_rate_limit()
             req_start = time.time()
-            resp = requests.post(url, json=payload)
+            resp = self._post(url, payload, "Google agent", on_event=on_event, headers=headers)
             req_duration = int((time.time() - req_start) * 1000)
-            self.last_api_call_time = time.time()
+            self.last_api_call_time = time.monotonic()
             resp.raise_for_status()
             
             if on_event:
                 on_event({"type": "api_response", "turn": turn + 1, "duration_ms": req_duration})
             
-            data = resp.json()
-            candidate = data['candidates'][0]
-            parts = candidate['content']['parts']
+            data = json_utils.loads(resp.content)
+            candidates = data.get('candidates')
+            if not candidates:
+                block_reason = data.get('promptFeedback', {}).get('blockReason', 'unknown')
+                raise ValueError(f"Google API returned no candidates (block reason: {block_reason})")
+            candidate = candidates[0]
+            parts = candidate.get('content', {}).get('parts', [])
             
             function_calls = [p for p in parts if 'functionCall' in p]
             
@@ -926,19 +894,22 @@ class SmartAgent:
         """Transition successfully named jobs to PENDING_COMPLETION."""
         success_count = 0
         fail_count = 0
+        updates = []
         
         for job in batch_jobs:
             current = self.job_store.get_job(job.job_id)
             if not current:
                 continue
             if current.status == JobStatus.AGENT_NAMED:
-                self.job_store.update_job(current.job_id, JobStatus.PENDING_COMPLETION)
+                updates.append((current.job_id, JobStatus.PENDING_COMPLETION, {}))
                 success_count += 1
                 logger.info(f"Agent finalized: {current.relative_path} -> {current.suggested_name}")
             elif current.status not in (JobStatus.PENDING_COMPLETION, JobStatus.COMPLETED):
-                self.job_store.update_job(current.job_id, JobStatus.FAILED,
-                                         error_message="Agent did not name this file")
+                updates.append((current.job_id, JobStatus.FAILED,
+                                {'error_message': "Agent did not name this file"}))
                 fail_count += 1
+        # One lock round-trip and at most one pending-jobs save for the whole batch
+        self.job_store.update_jobs_bulk(updates)
         
         logger.info(f"Agent batch {self._current_batch_id} finalized: {success_count} success, {fail_count} failed")
         
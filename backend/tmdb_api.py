@@ -7,6 +7,8 @@ import logging
 import requests
 from typing import Dict, List, Optional, Tuple
 
+from backend import json_utils
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,8 +47,8 @@ class TMDBClient:
         try:
             response = requests.get(url, headers=self.headers, params=params, timeout=10)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return json_utils.loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"TMDB API request failed for {endpoint}: {e}")
             return None
     
@@ -269,13 +271,14 @@ def format_tool_response(tmdb_result: Optional[Dict], query_type: str = 'movie')
                 f"TMDB ID: {tmdb_result['id']}")
     
     elif query_type == 'episode':
-        show_info = f"Show: {tmdb_result['show_name']} ({tmdb_result['show_year']})\n"
-        show_info += f"Season {tmdb_result['season_number']} Episodes:\n"
-        
-        for ep in tmdb_result['episodes']:
-            show_info += (f"  E{ep['episode_number']:02d}: {ep['name']} "
-                         f"(Aired: {ep['air_date'] or 'Unknown'})\n")
+        lines = [
+            f"Show: {tmdb_result['show_name']} ({tmdb_result['show_year']})\n",
+            f"Season {tmdb_result['season_number']} Episodes:\n",
+        ]
+        lines.extend(f"  E{ep['episode_number']:02d}: {ep['name']} "
+                     f"(Aired: {ep['air_date'] or 'Unknown'})\n"
+                     for ep in tmdb_result['episodes'])
         
-        return show_info
+        return "".join(lines)
     
     return str(tmdb_result)